@@ -0,0 +1,51 @@
+"""Compare JSON codecs on the sample payloads in tests/samples.
+
+Usage: python benchmarks/bench_codec.py [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [ROOT, os.path.join(ROOT, "src")]
+
+# pylint: disable=wrong-import-position
+from pymelcloud.codec import OrjsonCodec, StdlibJsonCodec  # noqa: E402
+
+SAMPLES_DIR = os.path.join(ROOT, "tests", "samples")
+
+
+def _codecs():
+    codecs = {"stdlib": StdlibJsonCodec()}
+    try:
+        codecs["orjson"] = OrjsonCodec()
+    except ImportError:
+        print("orjson is not installed, benchmarking stdlib only.")
+    return codecs
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    codecs = _codecs()
+    print(f"{'sample':<36}{'codec':<8}{'loads us':>10}{'dumps us':>10}")
+    for name in sorted(os.listdir(SAMPLES_DIR)):
+        with open(os.path.join(SAMPLES_DIR, name), "rb") as file:
+            payload = file.read()
+        for codec_name, codec in codecs.items():
+            obj = codec.loads(payload)
+            loads = timeit.timeit(lambda: codec.loads(payload), number=args.number)
+            dumps = timeit.timeit(lambda: codec.dumps(obj), number=args.number)
+            print(
+                f"{name:<36}{codec_name:<8}"
+                f"{loads / args.number * 1e6:>10.2f}"
+                f"{dumps / args.number * 1e6:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Time device property reads and writes on the sample devices in tests/samples.
+
+Every public property of the devices and Atw zones is read, every apply_write path
+supported by the sample is validated, and round_temperature and the daily energy
+computation are timed. Results are written as JSON for comparison across commits.
+
+Usage: python benchmarks/bench_properties.py [--number N] [--repeat N]
+    [--output FILE] [--baseline FILE]
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [ROOT, os.path.join(ROOT, "src")]
+
+# pylint: disable=wrong-import-position
+from pymelcloud import ata_device, atw_device, erv_device  # noqa: E402
+from pymelcloud.ata_device import AtaDevice  # noqa: E402
+from pymelcloud.atw_device import AtwDevice  # noqa: E402
+from pymelcloud.device import Device  # noqa: E402
+from pymelcloud.erv_device import ErvDevice  # noqa: E402
+from tests.util import build_device  # noqa: E402
+
+ENERGY_REPORT = {"Heating": [0.0, 1.2, 3.4], "Cooling": [0.5, 0.1], "Fan": [0.2]}
+
+SAMPLES: List[Tuple[str, type, str, str]] = [
+    ("ata", AtaDevice, "ata_listdevice.json", "ata_get.json"),
+    ("atw_1zone", AtwDevice, "atw_1zone_listdevice.json", "atw_1zone_get.json"),
+    ("atw_2zone", AtwDevice, "atw_2zone_listdevice.json", "atw_2zone_get.json"),
+    (
+        "atw_2zone_cancool",
+        AtwDevice,
+        "atw_2zone_cancool_listdevice.json",
+        "atw_2zone_cancool_get.json",
+    ),
+    ("erv", ErvDevice, "erv_listdevice.json", "erv_get.json"),
+]
+
+
+def _first(values) -> Any:
+    return values[0] if values else None
+
+
+def _writes(device: Device) -> Dict[str, Callable[[], Any]]:
+    """Return value factories for the apply_write keys of a device."""
+    if isinstance(device, AtaDevice):
+        return {
+            ata_device.PROPERTY_TARGET_TEMPERATURE: lambda: 22.0,
+            ata_device.PROPERTY_OPERATION_MODE: lambda: _first(device.operation_modes),
+            ata_device.PROPERTY_FAN_SPEED: lambda: _first(device.fan_speeds),
+            ata_device.PROPERTY_VANE_HORIZONTAL: lambda: _first(
+                device.vane_horizontal_positions
+            ),
+            ata_device.PROPERTY_VANE_VERTICAL: lambda: _first(
+                device.vane_vertical_positions
+            ),
+        }
+    if isinstance(device, AtwDevice):
+        writes = {
+            atw_device.PROPERTY_TARGET_TANK_TEMPERATURE: lambda: 50.0,
+            atw_device.PROPERTY_OPERATION_MODE: lambda: _first(device.operation_modes),
+        }
+        for zone in device.zones:
+            prefix = f"zone_{zone.zone_index}"
+            writes[f"{prefix}_target_temperature"] = lambda: 21.0
+            writes[f"{prefix}_target_heat_flow_temperature"] = lambda: 35.0
+            writes[f"{prefix}_target_heat_cool_temperature"] = lambda: 20.0
+            writes[f"{prefix}_operation_mode"] = (
+                lambda zone=zone: _first(zone.operation_modes)
+            )
+        return writes
+    return {
+        erv_device.PROPERTY_VENTILATION_MODE: lambda: _first(device.ventilation_modes),
+        erv_device.PROPERTY_FAN_SPEED: lambda: _first(device.fan_speeds),
+    }
+
+
+def _properties(obj: Any) -> List[str]:
+    """Return public property names of an object."""
+    return sorted(
+        name
+        for name, _ in inspect.getmembers(type(obj), lambda m: isinstance(m, property))
+        if not name.startswith("_")
+    )
+
+
+def _time(func: Callable[[], Any], number: int, repeat: int) -> float:
+    """Return the best time per call in nanoseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+async def _build(device_class: type, conf_name: str, state_name: str) -> Device:
+    device_conf, client = build_device(conf_name, state_name, ENERGY_REPORT)
+    device = device_class(device_conf, client)
+    await device.update()
+    return device
+
+
+def _bench_sample(
+    name: str, device: Device, number: int, repeat: int
+) -> List[Dict[str, Any]]:
+    results = []
+
+    def add(target: str, func: Callable[[], Any]):
+        results.append(
+            {
+                "sample": name,
+                "target": target,
+                "ns_per_call": _time(func, number, repeat),
+            }
+        )
+
+    class_name = type(device).__name__
+    for prop in _properties(device):
+        add(f"{class_name}.{prop}", lambda prop=prop: getattr(device, prop))
+
+    if isinstance(device, AtwDevice):
+        for zone in device.zones:
+            for prop in _properties(zone):
+                add(
+                    f"Zone{zone.zone_index}.{prop}",
+                    lambda zone=zone, prop=prop: getattr(zone, prop),
+                )
+
+    for key, value_factory in _writes(device).items():
+        value = value_factory()
+        try:
+            device.apply_write({}, key, value)
+        except ValueError as ex:
+            results.append(
+                {"sample": name, "target": f"apply_write.{key}", "skipped": str(ex)}
+            )
+            continue
+        add(
+            f"apply_write.{key}",
+            lambda key=key, value=value: device.apply_write({}, key, value),
+        )
+
+    add("round_temperature", lambda: device.round_temperature(21.37))
+    add(
+        "daily_energy_consumed.compute",
+        lambda: device._set_energy_report(  # pylint: disable=protected-access
+            ENERGY_REPORT
+        ),
+    )
+    return results
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print(results: List[Dict[str, Any]], baseline: Optional[Dict[str, float]]):
+    header = f"{'sample':<20}{'target':<56}{'ns':>10}"
+    if baseline is not None:
+        header += f"{'change':>9}"
+    print(header)
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['sample']:<20}{result['target']:<56}{'skipped':>10}")
+            continue
+        line = (
+            f"{result['sample']:<20}{result['target']:<56}"
+            f"{result['ns_per_call']:>10.1f}"
+        )
+        previous = (baseline or {}).get(f"{result['sample']}:{result['target']}")
+        if previous:
+            line += f"{(result['ns_per_call'] / previous - 1) * 100:>8.1f}%"
+        print(line)
+
+
+def _load_baseline(path: str) -> Dict[str, float]:
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    return {
+        f"{result['sample']}:{result['target']}": result["ns_per_call"]
+        for result in data["results"]
+        if "ns_per_call" in result
+    }
+
+
+async def _run(number: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for name, device_class, conf_name, state_name in SAMPLES:
+        device = await _build(device_class, conf_name, state_name)
+        results.extend(_bench_sample(name, device, number, repeat))
+    return results
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="bench_properties.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    args = parser.parse_args()
+
+    baseline = None if args.baseline is None else _load_baseline(args.baseline)
+    results = asyncio.run(_run(args.number, args.repeat))
+    _print(results, baseline)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "commit": _commit(),
+                "python": platform.python_version(),
+                "number": args.number,
+                "repeat": args.repeat,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,14 @@ from aiohttp import ClientSession
 
 from pymelcloud.ata_device import AtaDevice
 from pymelcloud.atw_device import AtwDevice
+from pymelcloud.cache import UnitsCache
 from pymelcloud.erv_device import ErvDevice
 from pymelcloud.client import Client as _Client
 from pymelcloud.client import login as _login
 from pymelcloud.const import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW, DEVICE_TYPE_ERV
 from pymelcloud.device import Device
+from pymelcloud.health import FreshnessPolicy
+from pymelcloud.registry import DeviceRegistry, warm_up_devices
 
 
 async def login(
@@ -24,12 +27,66 @@ async def login(
     return _client.token
 
 
+async def get_device_registry(
+    token: str,
+    session: Optional[ClientSession] = None,
+    *,
+    conf_update_interval: timedelta = timedelta(minutes=5),
+    device_set_debounce: timedelta = timedelta(seconds=1),
+    full_state_writes: bool = False,
+    conf_state_polling: bool = False,
+    failure_threshold: int = 3,
+    freshness: FreshnessPolicy = FreshnessPolicy(),
+    units_cache: Optional[UnitsCache] = None,
+    request_timeout: timedelta = timedelta(seconds=30),
+    max_concurrent_requests: Optional[int] = None,
+    warm_up: bool = False,
+    warm_up_limit: int = 8,
+) -> DeviceRegistry:
+    """Initialize a DeviceRegistry of the devices available with the token.
+
+    Call DeviceRegistry.update to pick up devices added to or removed from the
+    account. With warm_up, the devices that failed to warm up are available from
+    DeviceRegistry.warm_up_failures. See get_devices for the keyword arguments.
+    """
+    _client = _Client(
+        token,
+        session,
+        conf_update_interval=conf_update_interval,
+        device_set_debounce=device_set_debounce,
+        units_cache=units_cache,
+        request_timeout=request_timeout,
+        max_concurrent_requests=max_concurrent_requests,
+    )
+    registry = DeviceRegistry(
+        _client,
+        device_set_debounce=device_set_debounce,
+        full_state_writes=full_state_writes,
+        conf_state_polling=conf_state_polling,
+        failure_threshold=failure_threshold,
+        freshness=freshness,
+    )
+    await registry.update()
+    if warm_up:
+        await registry.warm_up(limit=warm_up_limit)
+    return registry
+
+
 async def get_devices(
     token: str,
     session: Optional[ClientSession] = None,
     *,
-    conf_update_interval=timedelta(minutes=5),
-    device_set_debounce=timedelta(seconds=1),
+    conf_update_interval: timedelta = timedelta(minutes=5),
+    device_set_debounce: timedelta = timedelta(seconds=1),
+    full_state_writes: bool = False,
+    conf_state_polling: bool = False,
+    failure_threshold: int = 3,
+    freshness: FreshnessPolicy = FreshnessPolicy(),
+    units_cache: Optional[UnitsCache] = None,
+    request_timeout: timedelta = timedelta(seconds=30),
+    max_concurrent_requests: Optional[int] = None,
+    warm_up: bool = False,
+    warm_up_limit: int = 8,
 ) -> Dict[str, List[Device]]:
     """Initialize Devices available with the token.
 
@@ -40,28 +97,40 @@ async def get_devices(
     Keyword arguments:
         conf_update_interval -- rate limit for fetching device confs. (default = 5 min)
         device_set_debounce -- debounce time for writing device state. (default = 1 s)
+        full_state_writes -- post the whole device state on writes instead of the
+        changed fields only. (default = False)
+        conf_state_polling -- refresh device state from the shared ListDevices
+        response instead of a Device/Get request per device. Device/Get is still
+        used for the first update and before writes. (default = False)
+        failure_threshold -- consecutive failed state fetches after which device
+        updates are skipped between backing off probes. 0 disables skipping.
+        (default = 3)
+        freshness -- state age limits used by Device.ensure_fresh.
+        (default = 1 min soft, 10 min hard)
+        units_cache -- cache for device unit info. Pass a UnitsCache with a path to
+        keep the unit info across restarts. (default = in-memory cache)
+        request_timeout -- total timeout of a MELCloud request. (default = 30 s)
+        max_concurrent_requests -- maximum number of MELCloud requests in flight.
+        Writes are sent before queued polls. (default = unlimited)
+        warm_up -- update all devices and load their units before returning. Failed
+        devices are logged and returned without state. Use get_device_registry to
+        get the failures from DeviceRegistry.warm_up_failures. (default = False)
+        warm_up_limit -- maximum number of devices warmed up concurrently.
+        (default = 8)
     """
-    _client = _Client(
+    registry = await get_device_registry(
         token,
         session,
         conf_update_interval=conf_update_interval,
         device_set_debounce=device_set_debounce,
+        full_state_writes=full_state_writes,
+        conf_state_polling=conf_state_polling,
+        failure_threshold=failure_threshold,
+        freshness=freshness,
+        units_cache=units_cache,
+        request_timeout=request_timeout,
+        max_concurrent_requests=max_concurrent_requests,
     )
-    await _client.update_confs()
-    return {
-        DEVICE_TYPE_ATA: [
-            AtaDevice(conf, _client, set_debounce=device_set_debounce)
-            for conf in _client.device_confs
-            if conf.get("Device", {}).get("DeviceType") == 0
-        ],
-        DEVICE_TYPE_ATW: [
-            AtwDevice(conf, _client, set_debounce=device_set_debounce)
-            for conf in _client.device_confs
-            if conf.get("Device", {}).get("DeviceType") == 1
-        ],
-        DEVICE_TYPE_ERV: [
-            ErvDevice(conf, _client, set_debounce=device_set_debounce)
-            for conf in _client.device_confs
-            if conf.get("Device", {}).get("DeviceType") == 3
-        ],
-    }
+    if warm_up:
+        await registry.warm_up(limit=warm_up_limit)
+    return registry.devices
@@ -1,9 +1,8 @@
 """Air-To-Air (DeviceType=0) device definition."""
-from datetime import timedelta
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 
 from pymelcloud.device import EFFECTIVE_FLAGS, Device
-from pymelcloud.client import Client
 
 PROPERTY_TARGET_TEMPERATURE = "target_temperature"
 PROPERTY_OPERATION_MODE = "operation_mode"
@@ -135,18 +134,101 @@ def _vertical_vane_to(position: str) -> int:
     raise ValueError(f"Invalid vertical vane position [{position}]")
 
 
+@lru_cache(maxsize=None)
+def _fan_speeds(has_automatic_fan_speed: bool, num_fan_speeds: int) -> Tuple[str, ...]:
+    speeds = [_fan_speed_from(num) for num in range(1, num_fan_speeds + 1)]
+    if has_automatic_fan_speed:
+        speeds.insert(0, FAN_SPEED_AUTO)
+    return tuple(speeds)
+
+
+class _AtaCapabilities(NamedTuple):
+    """Capabilities of an ATA device derived from the device conf."""
+
+    operation_modes: Tuple[str, ...]
+    has_automatic_fan_speed: bool
+    vane_horizontal_positions: Tuple[str, ...]
+    vane_vertical_positions: Tuple[str, ...]
+
+
+@lru_cache(maxsize=None)
+def _ata_capabilities(
+    can_heat: bool,
+    can_dry: bool,
+    can_cool: bool,
+    supports_auto: bool,
+    has_automatic_fan_speed: bool,
+    hide_vane_controls: bool,
+    supports_vane_vertical: bool,
+    supports_vane_horizontal: bool,
+    swing_function: bool,
+) -> _AtaCapabilities:
+    modes = []
+    if can_heat:
+        modes.append(OPERATION_MODE_HEAT)
+    if can_dry:
+        modes.append(OPERATION_MODE_DRY)
+    if can_cool:
+        modes.append(OPERATION_MODE_COOL)
+    modes.append(OPERATION_MODE_FAN_ONLY)
+    if supports_auto:
+        modes.append(OPERATION_MODE_HEAT_COOL)
+
+    # ModelSupportsVaneVertical and ModelSupportsVaneHorizontal are swapped in the API
+    h_positions: Tuple[str, ...] = ()
+    if not hide_vane_controls and supports_vane_vertical:
+        h_positions = (
+            H_VANE_POSITION_AUTO,  # ModelSupportsAuto could affect this.
+            H_VANE_POSITION_1,
+            H_VANE_POSITION_2,
+            H_VANE_POSITION_3,
+            H_VANE_POSITION_4,
+            H_VANE_POSITION_5,
+            H_VANE_POSITION_SPLIT,
+        )
+        if swing_function:
+            h_positions += (H_VANE_POSITION_SWING,)
+
+    v_positions: Tuple[str, ...] = ()
+    if not hide_vane_controls and supports_vane_horizontal:
+        v_positions = (
+            V_VANE_POSITION_AUTO,  # ModelSupportsAuto could affect this.
+            V_VANE_POSITION_1,
+            V_VANE_POSITION_2,
+            V_VANE_POSITION_3,
+            V_VANE_POSITION_4,
+            V_VANE_POSITION_5,
+        )
+        if swing_function:
+            v_positions += (V_VANE_POSITION_SWING,)
+
+    return _AtaCapabilities(
+        operation_modes=tuple(modes),
+        has_automatic_fan_speed=has_automatic_fan_speed,
+        vane_horizontal_positions=h_positions,
+        vane_vertical_positions=v_positions,
+    )
+
+
 class AtaDevice(Device):
     """Air-to-Air device."""
 
-    def __init__(
-        self,
-        device_conf: Dict[str, Any],
-        client: Client,
-        set_debounce=timedelta(seconds=1),
-    ):
-        """Initialize an ATA device."""
-        super().__init__(device_conf, client, set_debounce)
-        self.last_energy_value = None
+    _WRITE_FIELDS = {
+        **Device._WRITE_FIELDS,
+        0x02: ("OperationMode",),
+        0x04: ("SetTemperature",),
+        0x08: ("SetFanSpeed",),
+        0x10: ("VaneVertical",),
+        0x100: ("VaneHorizontal",),
+    }
+
+    _CONF_STATE_FIELDS = {
+        **Device._CONF_STATE_FIELDS,
+        "OperationMode": "OperationMode",
+        "RoomTemperature": "RoomTemperature",
+        "SetTemperature": "SetTemperature",
+        "SetFanSpeed": "FanSpeed",
+    }
 
     def apply_write(self, state: Dict[str, Any], key: str, value: Any):
         """Apply writes to state object.
@@ -175,6 +257,22 @@ class AtaDevice(Device):
 
         state[EFFECTIVE_FLAGS] = flags
 
+    def _build_capability_profile(
+        self, device_conf: Dict[str, Any]
+    ) -> _AtaCapabilities:
+        device = device_conf.get("Device", {})
+        return _ata_capabilities(
+            bool(device.get("CanHeat", False)),
+            bool(device.get("CanDry", False)),
+            bool(device.get("CanCool", False)),
+            bool(device.get("ModelSupportsAuto", False)),
+            bool(device.get("HasAutomaticFanSpeed", False)),
+            bool(device_conf.get("HideVaneControls", False)),
+            bool(device.get("ModelSupportsVaneVertical", False)),
+            bool(device.get("ModelSupportsVaneHorizontal", False)),
+            bool(device.get("SwingFunction", False)),
+        )
+
     @property
     def has_energy_consumed_meter(self) -> bool:
         """Return True if the device has an energy consumption meter."""
@@ -186,19 +284,10 @@ class AtaDevice(Device):
 
         The update interval is extremely slow and inconsistent. Empirical evidence
         suggests that it can vary between 1h 30min and 3h.
-        """
-        if self._device_conf is None:
-            return None
-        device = self._device_conf.get("Device", {})
-        value = device.get("CurrentEnergyConsumed", None)
-        if value is None:
-            return None
 
-        if value == 0.0:
-            return self.last_energy_value
-
-        self.last_energy_value = value / 1000.0
-        return self.last_energy_value
+        Occasional zero readings and meter resets are handled by the energy meter.
+        """
+        return self._energy_meter.total
 
     @property
     def room_temperature(self) -> Optional[float]:
@@ -262,26 +351,10 @@ class AtaDevice(Device):
         return _operation_mode_from(self._state.get("OperationMode", -1))
 
     @property
-    def operation_modes(self) -> List[str]:
+    def operation_modes(self) -> Tuple[str, ...]:
         """Return available operation modes."""
-        modes: List[str] = []
-
-        conf_dev = self._device_conf.get("Device", {})
-        if conf_dev.get("CanHeat", False):
-            modes.append(OPERATION_MODE_HEAT)
-
-        if conf_dev.get("CanDry", False):
-            modes.append(OPERATION_MODE_DRY)
-
-        if conf_dev.get("CanCool", False):
-            modes.append(OPERATION_MODE_COOL)
-
-        modes.append(OPERATION_MODE_FAN_ONLY)
-
-        if conf_dev.get("ModelSupportsAuto", False):
-            modes.append(OPERATION_MODE_HEAT_COOL)
-
-        return modes
+        profile: _AtaCapabilities = self._capability_profile()
+        return profile.operation_modes
 
     @property
     def fan_speed(self) -> Optional[str]:
@@ -294,7 +367,7 @@ class AtaDevice(Device):
         return _fan_speed_from(self._state.get("SetFanSpeed"))
 
     @property
-    def fan_speeds(self) -> Optional[List[str]]:
+    def fan_speeds(self) -> Optional[Tuple[str, ...]]:
         """Return available fan speeds.
 
         The supported fan speeds vary from device to device. The available modes are
@@ -315,15 +388,10 @@ class AtaDevice(Device):
         """
         if self._state is None:
             return None
-        speeds = []
-        if self._device_conf.get("Device", {}).get("HasAutomaticFanSpeed", False):
-            speeds.append(FAN_SPEED_AUTO)
-
-        num_fan_speeds = self._state.get("NumberOfFanSpeeds", 0)
-        for num in range(1, num_fan_speeds + 1):
-            speeds.append(_fan_speed_from(num))
-
-        return speeds
+        return _fan_speeds(
+            self._capability_profile().has_automatic_fan_speed,
+            self._state.get("NumberOfFanSpeeds", 0),
+        )
 
     @property
     def vane_horizontal(self) -> Optional[str]:
@@ -333,28 +401,10 @@ class AtaDevice(Device):
         return _horizontal_vane_from(self._state.get("VaneHorizontal"))
 
     @property
-    def vane_horizontal_positions(self) -> Optional[List[str]]:
+    def vane_horizontal_positions(self) -> Tuple[str, ...]:
         """Return available horizontal vane positions."""
-        if self._device_conf.get("HideVaneControls", False):
-            return []
-        device = self._device_conf.get("Device", {})
-        # ModelSupportsVaneVertical and ModelSupportsVaneHorizontal are swapped in the API
-        if not device.get("ModelSupportsVaneVertical", False):
-            return []
-
-        positions = [
-            H_VANE_POSITION_AUTO,  # ModelSupportsAuto could affect this.
-            H_VANE_POSITION_1,
-            H_VANE_POSITION_2,
-            H_VANE_POSITION_3,
-            H_VANE_POSITION_4,
-            H_VANE_POSITION_5,
-            H_VANE_POSITION_SPLIT,
-        ]
-        if device.get("SwingFunction", False):
-            positions.append(H_VANE_POSITION_SWING)
-
-        return positions
+        profile: _AtaCapabilities = self._capability_profile()
+        return profile.vane_horizontal_positions
 
     @property
     def vane_vertical(self) -> Optional[str]:
@@ -364,27 +414,10 @@ class AtaDevice(Device):
         return _vertical_vane_from(self._state.get("VaneVertical"))
 
     @property
-    def vane_vertical_positions(self) -> Optional[List[str]]:
+    def vane_vertical_positions(self) -> Tuple[str, ...]:
         """Return available vertical vane positions."""
-        if self._device_conf.get("HideVaneControls", False):
-            return []
-        device = self._device_conf.get("Device", {})
-        # ModelSupportsVaneHorizontal and ModelSupportsVaneVertical are swapped in the API
-        if not device.get("ModelSupportsVaneHorizontal", False):
-            return []
-
-        positions = [
-            V_VANE_POSITION_AUTO,  # ModelSupportsAuto could affect this.
-            V_VANE_POSITION_1,
-            V_VANE_POSITION_2,
-            V_VANE_POSITION_3,
-            V_VANE_POSITION_4,
-            V_VANE_POSITION_5,
-        ]
-        if device.get("SwingFunction", False):
-            positions.append(V_VANE_POSITION_SWING)
-
-        return positions
+        profile: _AtaCapabilities = self._capability_profile()
+        return profile.vane_vertical_positions
 
     @property
     def actual_fan_speed(self) -> Optional[str]:
@@ -1,5 +1,6 @@
 """Air-To-Water (DeviceType=1) device definition."""
-from typing import Any, Callable, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 from pymelcloud.device import EFFECTIVE_FLAGS, Device
 
@@ -16,6 +17,7 @@ PROPERTY_ZONE_2_OPERATION_MODE = "zone_2_operation_mode"
 
 OPERATION_MODE_AUTO = "auto"
 OPERATION_MODE_FORCE_HOT_WATER = "force_hot_water"
+_OPERATION_MODES = (OPERATION_MODE_AUTO, OPERATION_MODE_FORCE_HOT_WATER)
 
 STATUS_IDLE = "idle"
 STATUS_HEAT_WATER = "heat_water"
@@ -66,6 +68,29 @@ ZONE_STATUS_COOL = "cool"
 ZONE_STATUS_UNKNOWN = "unknown"
 
 
+class _AtwCapabilities(NamedTuple):
+    """Capabilities of an ATW device derived from the device conf."""
+
+    zone_operation_modes: Tuple[str, ...]
+
+
+@lru_cache(maxsize=None)
+def _atw_capabilities(can_heat: bool, can_cool: bool) -> _AtwCapabilities:
+    modes: Tuple[str, ...] = ()
+    if can_heat:
+        modes += (
+            ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
+            ZONE_OPERATION_MODE_HEAT_FLOW,
+            ZONE_OPERATION_MODE_CURVE,
+        )
+    if can_cool:
+        modes += (
+            ZONE_OPERATION_MODE_COOL_THERMOSTAT,
+            ZONE_OPERATION_MODE_COOL_FLOW,
+        )
+    return _AtwCapabilities(zone_operation_modes=modes)
+
+
 class Zone:
     """Zone controlled by Air-to-Water device."""
 
@@ -252,22 +277,10 @@ class Zone:
         )
 
     @property
-    def operation_modes(self) -> List[str]:
+    def operation_modes(self) -> Tuple[str, ...]:
         """Return list of available operation modes."""
-        modes = []
-        device = self._device_conf().get("Device", {})
-        if device.get("CanHeat", False):
-            modes += [
-                ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
-                ZONE_OPERATION_MODE_HEAT_FLOW,
-                ZONE_OPERATION_MODE_CURVE,
-            ]
-        if device.get("CanCool", False):
-            modes += [
-                ZONE_OPERATION_MODE_COOL_THERMOSTAT,
-                ZONE_OPERATION_MODE_COOL_FLOW,
-            ]
-        return modes
+        profile: _AtwCapabilities = self._device._capability_profile()
+        return profile.zone_operation_modes
 
     async def set_operation_mode(self, mode: str):
         """Change operation mode."""
@@ -290,6 +303,49 @@ class Zone:
 class AtwDevice(Device):
     """Air-to-Water device."""
 
+    _WRITE_FIELDS = {
+        **Device._WRITE_FIELDS,
+        0x08: ("OperationModeZone1",),
+        0x10: ("OperationModeZone2",),
+        0x10000: ("ForcedHotWaterMode",),
+        0x200000080: ("SetTemperatureZone1",),
+        0x800000200: ("SetTemperatureZone2",),
+        0x1000000000020: ("SetTankWaterTemperature",),
+        0x1000000000000: (
+            "SetHeatFlowTemperatureZone1",
+            "SetCoolFlowTemperatureZone1",
+            "SetHeatFlowTemperatureZone2",
+            "SetCoolFlowTemperatureZone2",
+        ),
+    }
+
+    _CONF_STATE_FIELDS = {
+        **Device._CONF_STATE_FIELDS,
+        **{
+            key: key
+            for key in (
+                "OperationMode",
+                "HolidayMode",
+                "OutdoorTemperature",
+                "TankWaterTemperature",
+                "SetTankWaterTemperature",
+                "ForcedHotWaterMode",
+            )
+        },
+        **{
+            f"{key}Zone{zone}": f"{key}Zone{zone}"
+            for zone in (1, 2)
+            for key in (
+                "OperationMode",
+                "Idle",
+                "RoomTemperature",
+                "SetTemperature",
+                "SetHeatFlowTemperature",
+                "SetCoolFlowTemperature",
+            )
+        },
+    }
+
     def apply_write(self, state: Dict[str, Any], key: str, value: Any):
         """Apply writes to state object."""
         flags = state.get(EFFECTIVE_FLAGS, 0)
@@ -329,6 +385,15 @@ class AtwDevice(Device):
 
         state[EFFECTIVE_FLAGS] = flags
 
+    def _build_capability_profile(
+        self, device_conf: Dict[str, Any]
+    ) -> _AtwCapabilities:
+        device = device_conf.get("Device", {})
+        return _atw_capabilities(
+            bool(device.get("CanHeat", False)),
+            bool(device.get("CanCool", False)),
+        )
+
     @property
     def tank_temperature(self) -> Optional[float]:
         """Return tank water temperature."""
@@ -422,9 +487,9 @@ class AtwDevice(Device):
         return OPERATION_MODE_AUTO
 
     @property
-    def operation_modes(self) -> List[str]:
+    def operation_modes(self) -> Tuple[str, ...]:
         """Return available operation modes."""
-        return [OPERATION_MODE_AUTO, OPERATION_MODE_FORCE_HOT_WATER]
+        return _OPERATION_MODES
 
     @property
     def holiday_mode(self) -> Optional[bool]:
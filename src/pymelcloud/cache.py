@@ -0,0 +1,92 @@
+"""Caches for static MELCloud data."""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from pymelcloud.clock import Clock, MonotonicClock
+from pymelcloud.storage import JsonStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UnitsCache:
+    """Device unit info keyed by device id with a time-to-live.
+
+    The unit info (model names and serial numbers) is static, so the entries can
+    be kept for a long time. If a path is given, the cache is persisted in a JSON
+    file and survives restarts. Entries stored within flush_interval are written
+    together, outside of the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        ttl: timedelta = timedelta(days=30),
+        flush_interval: timedelta = timedelta(seconds=10),
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize the cache.
+
+        Keyword arguments:
+            ttl -- time after which the unit info is fetched again. (default = 30 d)
+            flush_interval -- delay between storing units and writing the file.
+            (default = 10 s)
+            clock -- clock timing the flushes. (default = monotonic)
+        """
+        self._store = None if path is None else JsonStore(path)
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._entries: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Future[None]] = None
+        self._lock = asyncio.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._entries is None:
+            self._entries = {} if self._store is None else self._store.load()
+        return self._entries
+
+    def get(self, device_id: Any) -> Optional[List[Dict[str, Any]]]:
+        """Return cached units of a device or None if missing or expired."""
+        entry = self._load().get(str(device_id))
+        if entry is None:
+            return None
+        if time.time() - entry["fetched_at"] > self._ttl.total_seconds():
+            return None
+        units: List[Dict[str, Any]] = entry["units"]
+        return units
+
+    def set(self, device_id: Any, units: List[Dict[str, Any]]) -> None:
+        """Store units of a device and schedule writing the file."""
+        self._load()[str(device_id)] = {"fetched_at": time.time(), "units": units}
+        if self._store is None:
+            return
+        self._dirty = True
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        try:
+            await self._clock.sleep(self._flush_interval.total_seconds())
+        finally:
+            self._flush_task = None
+        try:
+            await self.flush()
+        except OSError as ex:
+            _LOGGER.warning("Failed to save device units: %s", ex)
+
+    async def flush(self) -> None:
+        """Write the units stored since the previous flush to the file."""
+        if self._store is None:
+            return
+        async with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._store.save, dict(self._load())
+            )
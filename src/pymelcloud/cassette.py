@@ -0,0 +1,197 @@
+"""Record and replay MELCloud traffic."""
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+)
+
+from pymelcloud.clock import Clock, MonotonicClock
+
+CASSETTE_VERSION = 1
+
+SCRUBBED_KEYS = frozenset(
+    {
+        "ContextKey",
+        "Password",
+        "CaptchaResponse",
+        "X-MitsContextKey",
+        "MacAddress",
+        "SerialNumber",
+    }
+)
+# Matches e.g. EmailAddress, OwnerEmail, OwnerName and DeviceName.
+SCRUBBED_SUFFIXES = ("Email", "EmailAddress", "Name")
+_SCRUBBED = "***"
+
+
+class Transport(Protocol):
+    """Hook around the requests sent by Client."""
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[bytes],
+        send: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """Return the response body of a request.
+
+        send sends the request to MELCloud and returns the response body.
+        """
+
+
+def _scrub(value: Any, keys: FrozenSet[str], suffixes: Tuple[str, ...]) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: (
+                _SCRUBBED
+                if key in keys or key.endswith(suffixes)
+                else _scrub(item, keys, suffixes)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_scrub(item, keys, suffixes) for item in value]
+    return value
+
+
+def _scrub_body(
+    data: Optional[bytes], keys: FrozenSet[str], suffixes: Tuple[str, ...]
+) -> Optional[str]:
+    if data is None:
+        return None
+    text = data.decode("utf-8")
+    try:
+        decoded = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(_scrub(decoded, keys, suffixes), separators=(",", ":"))
+
+
+class CassetteRecorder:
+    """Transport recording requests, responses and timings.
+
+    Values of SCRUBBED_KEYS and of keys ending with SCRUBBED_SUFFIXES are replaced
+    in request and response bodies and headers are not recorded, so the cassette
+    does not contain tokens, credentials or personal details of the account and of
+    the owners of shared devices. The cassette is written as gzip compressed JSON
+    lines by save.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        scrub_keys: FrozenSet[str] = SCRUBBED_KEYS,
+        scrub_suffixes: Tuple[str, ...] = SCRUBBED_SUFFIXES,
+    ):
+        """Initialize a recorder writing to path."""
+        self._path = path
+        self._scrub_keys = scrub_keys
+        self._scrub_suffixes = scrub_suffixes
+        self._start = time.monotonic()
+        self._interactions: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        """Return number of recorded requests."""
+        return len(self._interactions)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[bytes],
+        send: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """Send the request and record it."""
+        started = time.monotonic()
+        response = await send()
+        self._interactions.append(
+            {
+                "offset": started - self._start,
+                "elapsed": time.monotonic() - started,
+                "method": method,
+                "path": path,
+                "request": _scrub_body(data, self._scrub_keys, self._scrub_suffixes),
+                "response": _scrub_body(
+                    response, self._scrub_keys, self._scrub_suffixes
+                ),
+                "size": len(response),
+            }
+        )
+        return response
+
+    def save(self) -> None:
+        """Write the recorded requests to the cassette file."""
+        with gzip.open(self._path, "wt", encoding="utf-8") as file:
+            file.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+            for interaction in self._interactions:
+                file.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Return the recorded requests of a cassette file."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        if header.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version [{header.get('version')}]")
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class CassettePlayer:
+    """Transport serving recorded responses without sending requests.
+
+    Requests are matched by method and path in recorded order. Each response is
+    delayed by its recorded latency divided by speed. A speed of None serves the
+    responses without delay.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        speed: Optional[float] = 1.0,
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize a player reading a cassette file."""
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Invalid replay speed [{speed}]")
+        self._speed = speed
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._interactions: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = (
+            defaultdict(deque)
+        )
+        for interaction in load_cassette(path):
+            key = (interaction["method"], interaction["path"])
+            self._interactions[key].append(interaction)
+
+    def remaining(self) -> int:
+        """Return number of recorded responses not served yet."""
+        return sum(len(queue) for queue in self._interactions.values())
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        data: Optional[bytes],
+        send: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """Serve the next recorded response of the request."""
+        queue = self._interactions.get((method, path))
+        if not queue:
+            raise ValueError(f"No recorded response [{method} {path}]")
+        interaction = queue.popleft()
+        if self._speed is not None:
+            await self._clock.sleep(interaction["elapsed"] / self._speed)
+        return (interaction["response"] or "").encode("utf-8")
@@ -1,8 +1,33 @@
 """MEL API access."""
+import asyncio
+import hashlib
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
-
-from aiohttp import ClientSession
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from aiohttp import ClientSession, ClientTimeout
+
+from pymelcloud.cache import UnitsCache
+from pymelcloud.cassette import Transport
+from pymelcloud.clock import Clock, MonotonicClock
+from pymelcloud.codec import JsonCodec, default_codec
+from pymelcloud.hedge import HedgePolicy
+from pymelcloud.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE_WRITE,
+    RequestScheduler,
+)
 
 BASE_URL = "https://app.melcloud.com/Mitsubishi.Wifi.Client"
 
@@ -20,6 +45,79 @@ def _headers(token: str) -> Dict[str, str]:
     }
 
 
+# Device conf fields describing a device rather than its current readings. Changes
+# to other fields, e.g. RoomTemperature or LastTimeStamp, do not change a device.
+_STRUCTURAL_CONF_FIELDS = (
+    "DeviceName",
+    "BuildingID",
+    "AreaID",
+    "FloorID",
+    "AccessLevel",
+    "DirectAccess",
+    "HideVaneControls",
+)
+_STRUCTURAL_DEVICE_FIELDS = (
+    "DeviceType",
+    "CanHeat",
+    "CanCool",
+    "CanDry",
+    "ModelSupportsAuto",
+    "ModelSupportsVaneVertical",
+    "ModelSupportsVaneHorizontal",
+    "SwingFunction",
+    "HasAutomaticFanSpeed",
+    "HasEnergyConsumedMeter",
+    "TemperatureIncrement",
+    "HasZone2",
+    "HasThermostatZone1",
+    "HasThermostatZone2",
+    "MaxTankTemperature",
+    "HasBypassVentilationMode",
+    "HasAutoVentilationMode",
+)
+
+
+def _conf_structure(conf: Dict[str, Any]) -> Tuple[Any, ...]:
+    device = conf.get("Device", {})
+    return tuple(conf.get(key) for key in _STRUCTURAL_CONF_FIELDS) + tuple(
+        device.get(key) for key in _STRUCTURAL_DEVICE_FIELDS
+    )
+
+
+class ConfDiff(NamedTuple):
+    """Device ids added, removed and changed between two device conf lists.
+
+    A device is changed when its name, location, access level or capability flags
+    differ. Readings in the conf are ignored.
+    """
+
+    added: FrozenSet[Any] = frozenset()
+    removed: FrozenSet[Any] = frozenset()
+    changed: FrozenSet[Any] = frozenset()
+
+    def __bool__(self) -> bool:
+        """Return True if any device was added, removed or changed."""
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_confs(
+    old: Iterable[Dict[str, Any]], new: Iterable[Dict[str, Any]]
+) -> ConfDiff:
+    """Return the difference between two device conf lists keyed by DeviceID."""
+    old_by_id = {conf.get("DeviceID"): conf for conf in old}
+    new_by_id = {conf.get("DeviceID"): conf for conf in new}
+    return ConfDiff(
+        added=frozenset(new_by_id.keys() - old_by_id.keys()),
+        removed=frozenset(old_by_id.keys() - new_by_id.keys()),
+        changed=frozenset(
+            device_id
+            for device_id, conf in new_by_id.items()
+            if device_id in old_by_id
+            and _conf_structure(old_by_id[device_id]) != _conf_structure(conf)
+        ),
+    )
+
+
 async def _do_login(_session: ClientSession, email: str, password: str):
     body = {
         "Email": email,
@@ -61,6 +159,31 @@ async def login(
     )
 
 
+def _changed_keys(
+    old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]
+) -> FrozenSet[str]:
+    """Return keys with different values in two state dicts."""
+    if old is new:
+        return frozenset()
+    old = old or {}
+    new = new or {}
+    return frozenset(
+        key for key in old.keys() | new.keys() if old.get(key) != new.get(key)
+    )
+
+
+class DeviceLocation(NamedTuple):
+    """Location of a device in the building structure.
+
+    floor_id and area_id are None for devices placed directly under a building or
+    floor.
+    """
+
+    building_id: Optional[int]
+    floor_id: Optional[int]
+    area_id: Optional[int]
+
+
 class Client:
     """MELCloud client.
 
@@ -76,8 +199,33 @@ class Client:
         user_update_interval=timedelta(minutes=5),
         conf_update_interval=timedelta(seconds=59),
         device_set_debounce=timedelta(seconds=1),
+        codec: Optional[JsonCodec] = None,
+        units_cache: Optional[UnitsCache] = None,
+        request_timeout: timedelta = timedelta(seconds=30),
+        endpoint_timeouts: Optional[Dict[str, timedelta]] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        max_concurrent_requests: Optional[int] = None,
+        clock: Optional[Clock] = None,
+        transport: Optional[Transport] = None,
     ):
-        """Initialize MELCloud client."""
+        """Initialize MELCloud client.
+
+        Keyword arguments:
+            codec -- JSON codec for request and response bodies. orjson is used if
+            installed, json from the standard library otherwise.
+            units_cache -- cache for device unit info. (default = in-memory cache)
+            request_timeout -- total timeout of a request. (default = 30 s)
+            endpoint_timeouts -- timeouts overriding request_timeout keyed by
+            endpoint path without the query, e.g. "Device/Get".
+            hedge_policy -- policy for duplicating slow GET requests. Writes are
+            never hedged. (default = no hedging)
+            max_concurrent_requests -- maximum number of requests in flight. Free
+            slots go to writes first, then interactive reads, background polls and
+            bulk requests. (default = unlimited)
+            clock -- clock for update intervals and deadlines. (default = monotonic)
+            transport -- hook around the requests, e.g. a CassetteRecorder or a
+            CassettePlayer. (default = send requests to MELCloud)
+        """
         self._token = token
         if session:
             self._session = session
@@ -88,10 +236,25 @@ class Client:
         self._user_update_interval = user_update_interval
         self._conf_update_interval = conf_update_interval
         self._device_set_debounce = device_set_debounce
+        self._codec = default_codec() if codec is None else codec
+        self._responses: Dict[str, Tuple[bytes, Any]] = {}
+        self._units_cache = UnitsCache() if units_cache is None else units_cache
+        self._request_timeout = ClientTimeout(total=request_timeout.total_seconds())
+        self._hedge_policy = hedge_policy
+        self._transport = transport
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._scheduler = RequestScheduler(max_concurrent_requests, clock=self._clock)
+        self._endpoint_timeouts = {
+            endpoint: ClientTimeout(total=timeout.total_seconds())
+            for endpoint, timeout in (endpoint_timeouts or {}).items()
+        }
 
         self._last_user_update = None
         self._last_conf_update = None
         self._device_confs: List[Dict[str, Any]] = []
+        self._device_conf_entries: Any = None
+        self._conf_generation = 0
+        self._device_locations: Dict[Any, DeviceLocation] = {}
         self._account: Optional[Dict[str, Any]] = None
 
     @property
@@ -99,89 +262,276 @@ class Client:
         """Return currently used token."""
         return self._token
 
+    @property
+    def clock(self) -> Clock:
+        """Return the clock used by the client."""
+        return self._clock
+
     @property
     def device_confs(self) -> List[Dict[Any, Any]]:
         """Return device configurations."""
         return self._device_confs
 
+    @property
+    def conf_generation(self) -> int:
+        """Return the number of times device_confs has been fetched."""
+        return self._conf_generation
+
+    @property
+    def device_locations(self) -> Dict[Any, DeviceLocation]:
+        """Return building, floor and area of the devices keyed by device id."""
+        return self._device_locations
+
     @property
     def account(self) -> Optional[Dict[Any, Any]]:
         """Return account."""
         return self._account
 
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        body: Any = None,
+        *,
+        priority: int = PRIORITY_BACKGROUND,
+    ) -> Any:
+        """Send a request to MELCloud and decode the JSON response.
+
+        The request waits for a slot of the request scheduler with the given
+        priority.
+
+        GET responses are hashed per path. If the body is identical to the previous
+        response, the previously decoded object is returned without decoding, so
+        callers can detect unchanged responses by identity. The returned objects are
+        shared and must not be modified. GET requests are hedged by the hedge policy.
+        """
+        headers = _headers(self._token)
+        data = None
+        if body is not None:
+            headers["Content-Type"] = "application/json; charset=utf-8"
+            data = self._codec.dumps(body)
+
+        async def send_http() -> bytes:
+            async with self._session.request(
+                method,
+                f"{BASE_URL}/{path}",
+                headers=headers,
+                data=data,
+                raise_for_status=True,
+                timeout=self._endpoint_timeouts.get(
+                    path.split("?", 1)[0], self._request_timeout
+                ),
+            ) as resp:
+                return await resp.read()
+
+        async def send() -> bytes:
+            async with self._scheduler.slot(priority):
+                if self._transport is None:
+                    return await send_http()
+                return await self._transport.request(method, path, data, send_http)
+
+        if method != "GET":
+            return self._codec.loads(await send())
+
+        if self._hedge_policy is None:
+            raw = await send()
+        else:
+            raw = await self._hedge_policy.run(send)
+
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        previous = self._responses.get(path)
+        if previous is not None and previous[0] == digest:
+            return previous[1]
+        decoded = self._codec.loads(raw)
+        self._responses[path] = (digest, decoded)
+        return decoded
+
     async def _fetch_user_details(self):
         """Fetch user details."""
-        async with self._session.get(
-            f"{BASE_URL}/User/GetUserDetails",
-            headers=_headers(self._token),
-            raise_for_status=True,
-        ) as resp:
-            self._account = await resp.json()
-
-    async def _fetch_device_confs(self):
-        """Fetch all configured devices."""
-        url = f"{BASE_URL}/User/ListDevices"
-        async with self._session.get(
-            url, headers=_headers(self._token), raise_for_status=True
-        ) as resp:
-            entries = await resp.json()
-            new_devices = []
-            for entry in entries:
-                new_devices = new_devices + entry["Structure"]["Devices"]
-
-                for area in entry["Structure"]["Areas"]:
-                    new_devices = new_devices + area["Devices"]
-
-                for floor in entry["Structure"]["Floors"]:
-                    new_devices = new_devices + floor["Devices"]
-
-                    for area in floor["Areas"]:
-                        new_devices = new_devices + area["Devices"]
-
-            visited = set()
-            self._device_confs = [
-                d
-                for d in new_devices
-                if d["DeviceID"] not in visited and not visited.add(d["DeviceID"])
-            ]
-
-    async def update_confs(self):
+        self._account = await self._request("GET", "User/GetUserDetails")
+
+    async def _fetch_device_confs(self) -> ConfDiff:
+        """Fetch all configured devices.
+
+        Returns the difference to the previously fetched device confs.
+        """
+        entries = await self._request("GET", "User/ListDevices")
+        self._conf_generation += 1
+        if entries is self._device_conf_entries:
+            return ConfDiff()
+        self._device_conf_entries = entries
+        new_devices: List[Dict[str, Any]] = []
+        locations: Dict[Any, DeviceLocation] = {}
+
+        def add_devices(devices, location: DeviceLocation):
+            for device in devices:
+                if device["DeviceID"] not in locations:
+                    locations[device["DeviceID"]] = location
+                    new_devices.append(device)
+
+        for entry in entries:
+            building_id = entry.get("ID")
+            structure = entry["Structure"]
+            add_devices(structure["Devices"], DeviceLocation(building_id, None, None))
+
+            for area in structure["Areas"]:
+                add_devices(
+                    area["Devices"],
+                    DeviceLocation(building_id, None, area.get("ID")),
+                )
+
+            for floor in structure["Floors"]:
+                floor_id = floor.get("ID")
+                add_devices(
+                    floor["Devices"], DeviceLocation(building_id, floor_id, None)
+                )
+
+                for area in floor["Areas"]:
+                    add_devices(
+                        area["Devices"],
+                        DeviceLocation(building_id, floor_id, area.get("ID")),
+                    )
+
+        diff = diff_confs(self._device_confs, new_devices)
+        self._device_confs = new_devices
+        self._device_locations = locations
+        return diff
+
+    async def update_confs(self) -> ConfDiff:
         """Update device_confs and account.
 
         Calls are rate limited to allow Device instances to freely poll their own
         state while refreshing the device_confs list and account.
+
+        Returns the ids of devices added, removed and changed by this call. The diff
+        is empty if the confs were not fetched.
         """
-        now = datetime.now()
+        now = self._clock.monotonic()
+        diff = ConfDiff()
 
         if (
             self._last_conf_update is None
-            or now - self._last_conf_update > self._conf_update_interval
+            or now - self._last_conf_update
+            > self._conf_update_interval.total_seconds()
         ):
-            await self._fetch_device_confs()
+            diff = await self._fetch_device_confs()
             self._last_conf_update = now
 
         if (
             self._last_user_update is None
-            or now - self._last_user_update > self._user_update_interval
+            or now - self._last_user_update
+            > self._user_update_interval.total_seconds()
         ):
             await self._fetch_user_details()
             self._last_user_update = now
 
-    async def fetch_device_units(self, device) -> Optional[Dict[Any, Any]]:
+        return diff
+
+    async def poll(
+        self,
+        devices: Iterable[Any],
+        *,
+        max_concurrent_updates: int = 8,
+        max_pending_results: int = 8,
+        return_exceptions: bool = False,
+        deadline: Optional[timedelta] = None,
+    ) -> AsyncIterator[Tuple[Any, Union[FrozenSet[str], BaseException]]]:
+        """Update devices concurrently and yield them as their updates complete.
+
+        Yields (device, changed_fields) tuples where changed_fields contains the
+        state keys changed by the update. Completed updates are buffered up to
+        max_pending_results. Further updates are not started while the buffer is
+        full, so a slow consumer throttles the poll cycle.
+
+        If return_exceptions is True, a failed update yields (device, exception).
+        Otherwise the first failure is raised and remaining updates are cancelled.
+        Closing the generator early cancels the remaining updates as well.
+
+        Devices whose update times out are marked stale and not yielded, the other
+        updates continue. If the device updates take longer than deadline, the
+        remaining updates are cancelled, their devices are marked stale and the
+        generator stops.
+        """
+        await self.update_confs()
+
+        devices = list(devices)
+        queue: asyncio.Queue[Tuple[Any, Any]] = asyncio.Queue(
+            maxsize=max_pending_results
+        )
+        semaphore = asyncio.Semaphore(max_concurrent_updates)
+
+        async def _update(device: Any) -> None:
+            async with semaphore:
+                previous_state = device._state
+                try:
+                    await device.update()
+                except asyncio.TimeoutError:
+                    device.mark_stale()
+                    result: Any = None
+                except Exception as ex:  # pylint: disable=broad-except
+                    result = ex
+                else:
+                    result = _changed_keys(previous_state, device._state)
+                await queue.put((device, result))
+
+        tasks = [asyncio.ensure_future(_update(device)) for device in devices]
+        timer = (
+            None
+            if deadline is None
+            else asyncio.ensure_future(self._clock.sleep(deadline.total_seconds()))
+        )
+        pending = {id(device): device for device in devices}
+        try:
+            for _ in tasks:
+                getter = asyncio.ensure_future(queue.get())
+                if timer is not None:
+                    await asyncio.wait(
+                        {getter, timer}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if not getter.done():
+                        getter.cancel()
+                        for device in pending.values():
+                            device.mark_stale()
+                        return
+                device, result = await getter
+                del pending[id(device)]
+                if result is None:
+                    continue
+                if isinstance(result, BaseException) and not return_exceptions:
+                    raise result
+                yield device, result
+        finally:
+            if timer is not None:
+                timer.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cached_device_units(self, device_id: Any) -> Optional[List[Dict[Any, Any]]]:
+        """Return cached unit information of a device without fetching it."""
+        return self._units_cache.get(device_id)
+
+    async def fetch_device_units(self, device) -> Optional[List[Dict[Any, Any]]]:
         """Fetch unit information for a device.
 
         User provided info such as indoor/outdoor unit model names and
-        serial numbers.
+        serial numbers. The response is served from the units cache while it is
+        valid.
         """
-        async with self._session.post(
-            f"{BASE_URL}/Device/ListDeviceUnits",
-            headers=_headers(self._token),
-            json={"deviceId": device.device_id},
-            raise_for_status=True,
-        ) as resp:
-            return await resp.json()
-
-    async def fetch_device_state(self, device) -> Optional[Dict[Any, Any]]:
+        units = self._units_cache.get(device.device_id)
+        if units is None:
+            units = await self._request(
+                "POST",
+                "Device/ListDeviceUnits",
+                {"deviceId": device.device_id},
+                priority=PRIORITY_BULK,
+            )
+            self._units_cache.set(device.device_id, units)
+        return units
+
+    async def fetch_device_state(
+        self, device, *, priority: int = PRIORITY_BACKGROUND
+    ) -> Optional[Dict[Any, Any]]:
         """Fetch state information of a device.
 
         This method should not be called more than once a minute. Rate
@@ -189,31 +539,32 @@ class Client:
         """
         device_id = device.device_id
         building_id = device.building_id
-        async with self._session.get(
-            f"{BASE_URL}/Device/Get?id={device_id}&buildingID={building_id}",
-            headers=_headers(self._token),
-            raise_for_status=True,
-        ) as resp:
-            return await resp.json()
+        return await self._request(
+            "GET",
+            f"Device/Get?id={device_id}&buildingID={building_id}",
+            priority=priority,
+        )
 
     async def fetch_energy_report(self, device) -> Optional[Dict[Any, Any]]:
-        """Fetch energy report containing today and 1-2 days from the past."""
+        """Fetch energy report containing today and 1-2 days from the past.
+
+        The report is fetched with bulk priority.
+        """
         device_id = device.device_id
         from_str = (datetime.today() - timedelta(days=2)).strftime("%Y-%m-%d")
         to_str = (datetime.today() + timedelta(days=2)).strftime("%Y-%m-%d")
 
-        async with self._session.post(
-            f"{BASE_URL}/EnergyCost/Report",
-            headers=_headers(self._token),
-            json={
+        return await self._request(
+            "POST",
+            "EnergyCost/Report",
+            {
                 "DeviceId": device_id,
                 "UseCurrency": False,
                 "FromDate": f"{from_str}T00:00:00",
-                "ToDate": f"{to_str}T00:00:00"
+                "ToDate": f"{to_str}T00:00:00",
             },
-            raise_for_status=True,
-        ) as resp:
-            return await resp.json()
+            priority=PRIORITY_BULK,
+        )
 
     async def set_device_state(self, device):
         """Update device state.
@@ -231,10 +582,6 @@ class Client:
         else:
             raise ValueError(f"Unsupported device type [{device_type}]")
 
-        async with self._session.post(
-            f"{BASE_URL}/Device/{setter}",
-            headers=_headers(self._token),
-            json=device,
-            raise_for_status=True,
-        ) as resp:
-            return await resp.json()
+        return await self._request(
+            "POST", f"Device/{setter}", device, priority=PRIORITY_INTERACTIVE_WRITE
+        )
@@ -0,0 +1,91 @@
+"""Clocks used for intervals, debouncing and time-to-live decisions."""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import List, Protocol, Tuple
+
+
+class Clock(Protocol):
+    """Source of monotonic time and sleeping."""
+
+    def monotonic(self) -> float:
+        """Return monotonic time in seconds."""
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep for seconds."""
+
+
+class MonotonicClock:
+    """Clock using time.monotonic and asyncio.sleep."""
+
+    def monotonic(self) -> float:
+        """Return monotonic time in seconds."""
+        return time.monotonic()
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep for seconds."""
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """Clock advanced explicitly, for tests and simulations.
+
+    Sleepers are woken by advance in deadline order, with the clock set to their
+    deadline while they run. The event loop is drained after each wake-up, so the
+    woken task and any tasks it starts or waits on run until they block before
+    the next sleeper is woken.
+    """
+
+    def __init__(self, start: float = 0.0):
+        """Initialize the clock at start seconds."""
+        self._now = start
+        self._sequence = itertools.count()
+        self._sleepers: List[Tuple[float, int, asyncio.Future[None]]] = []
+
+    def monotonic(self) -> float:
+        """Return the current virtual time in seconds."""
+        return self._now
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep until the clock has been advanced by seconds."""
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._sleepers, (self._now + seconds, next(self._sequence), future)
+        )
+        await future
+
+    async def advance(self, seconds: float) -> None:
+        """Move the clock forward, running the sleepers due on the way.
+
+        Tasks waiting on real I/O or real timers are not waited for.
+        """
+        target = self._now + seconds
+        # Let tasks started before the call reach their sleep before the clock moves.
+        await _run_until_idle()
+        while self._sleepers and self._sleepers[0][0] <= target:
+            deadline, _, future = heapq.heappop(self._sleepers)
+            self._now = max(self._now, deadline)
+            if future.done():
+                continue
+            future.set_result(None)
+            await _run_until_idle()
+        self._now = target
+
+
+async def _run_until_idle(fallback_rounds: int = 100) -> None:
+    """Run the event loop until no other callbacks are ready.
+
+    Loops that do not expose their ready queue get a fixed number of iterations.
+    """
+    ready = getattr(asyncio.get_running_loop(), "_ready", None)
+    if ready is None:
+        for _ in range(fallback_rounds):
+            await asyncio.sleep(0)
+        return
+    await asyncio.sleep(0)
+    while ready:
+        await asyncio.sleep(0)
@@ -0,0 +1,57 @@
+"""JSON codecs used for MELCloud requests and responses."""
+import json
+from typing import Any, Protocol
+
+
+class JsonCodec(Protocol):
+    """Encode and decode JSON bodies."""
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a JSON document."""
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as a JSON document."""
+
+
+class StdlibJsonCodec:
+    """JSON codec using the json module of the standard library."""
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a JSON document."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as a JSON document."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec:
+    """JSON codec using orjson."""
+
+    def __init__(self) -> None:
+        """Initialize the codec.
+
+        Raises ImportError if orjson is not installed.
+        """
+        import orjson  # pylint: disable=import-outside-toplevel
+
+        self._orjson = orjson
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a JSON document."""
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode an object as a JSON document."""
+        return self._orjson.dumps(obj)
+
+
+def default_codec() -> JsonCodec:
+    """Return the fastest available codec.
+
+    orjson is used if it is installed, the standard library otherwise.
+    """
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return StdlibJsonCodec()
@@ -1,11 +1,13 @@
 """Base MELCloud device."""
 import asyncio
+import logging
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from pymelcloud.client import Client
+from pymelcloud.clock import Clock, MonotonicClock
 from pymelcloud.const import (
     DEVICE_TYPE_LOOKUP,
     DEVICE_TYPE_UNKNOWN,
@@ -13,23 +15,83 @@ from pymelcloud.const import (
     UNIT_TEMP_FAHRENHEIT,
     ACCESS_LEVEL,
 )
+from pymelcloud.energy import EnergyMeter
+from pymelcloud.scheduler import PRIORITY_INTERACTIVE_READ
+from pymelcloud.health import (
+    CircuitBreaker,
+    DeviceHealth,
+    FreshnessPolicy,
+    is_stale,
+)
+
+_LOGGER = logging.getLogger(__name__)
 
 PROPERTY_POWER = "power"
 
+_ENERGY_REPORT_MODES = ("Heating", "Cooling", "Auto", "Dry", "Fan", "Other")
+
 EFFECTIVE_FLAGS = "EffectiveFlags"
 HAS_PENDING_COMMAND = "HasPendingCommand"
 
+_IDENTITY_FIELDS = ("DeviceID", "DeviceType")
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a MELCloud timestamp as UTC.
+
+    MELCloud omits the timezone and returns a varying number of fractional second
+    digits, e.g. "2020-07-03T09:03:50.32" or "2020-01-01T12:00:00".
+    """
+    if value is None:
+        return None
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
 
 class Device(ABC):
     """MELCloud base device representation."""
 
+    # State fields written by EffectiveFlags masks. Extended by device types.
+    _WRITE_FIELDS: Dict[int, Tuple[str, ...]] = {0x01: ("Power",)}
+
+    # State fields mirrored in the Device block of the device conf, state key to
+    # conf key. Extended by device types. LastCommunication is not mirrored, the
+    # conf LastTimeStamp lags behind it.
+    _CONF_STATE_FIELDS: Dict[str, str] = {
+        "Power": "Power",
+        "HasError": "HasError",
+        "ErrorCode": "ErrorCode",
+    }
+
     def __init__(
         self,
         device_conf: Dict[str, Any],
         client: Client,
         set_debounce=timedelta(seconds=1),
+        *,
+        full_state_writes: bool = False,
+        conf_state_polling: bool = False,
+        failure_threshold: int = 3,
+        stale_after: timedelta = timedelta(hours=1),
+        freshness: FreshnessPolicy = FreshnessPolicy(),
+        clock: Optional[Clock] = None,
     ):
-        """Initialize a device."""
+        """Initialize a device.
+
+        Keyword arguments:
+            full_state_writes -- post the whole state on writes instead of the
+            fields selected by EffectiveFlags. (default = False)
+            conf_state_polling -- refresh the state from the device conf instead of
+            Device/Get after the first update. (default = False)
+            failure_threshold -- consecutive failed state fetches after which
+            updates are skipped between backing off probes. 0 disables skipping.
+            (default = 3)
+            stale_after -- time without communication after which the device is
+            reported stale in health. (default = 1 h)
+            freshness -- state age limits used by ensure_fresh.
+            (default = 1 min soft, 10 min hard)
+            clock -- clock for the write debounce, probe intervals and state age.
+            Should be the clock of the client. (default = monotonic)
+        """
         self.device_id = device_conf.get("DeviceID")
         self.building_id = device_conf.get("BuildingID")
         self.mac = device_conf.get("MacAddress")
@@ -41,11 +103,32 @@ class Device(ABC):
             self._use_fahrenheit = client.account.get("UseFahrenheit", False)
 
         self._device_conf = device_conf
+        self._capabilities: Any = None
+        self._capabilities_conf: Optional[Dict[str, Any]] = None
         self._state = None
-        self._device_units = None
-        self._energy_report = None
+        self._last_seen: Optional[datetime] = None
+        self._marked_stale = False
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._state_updated_at: Optional[float] = None
+        self._freshness = freshness
+        self._refresh_task: Optional[asyncio.Future[None]] = None
+        self._state_conf_timestamp: Optional[str] = None
+        self._state_conf_generation: Optional[int] = None
+        self._skipped_state_fetches = 0
+        self._device_units: Optional[List[Dict[Any, Any]]] = None
+        self._units_task: Optional[asyncio.Future[None]] = None
+        self._energy_report: Optional[Dict[str, Any]] = None
+        self._daily_energy_consumed: Optional[float] = None
+        self._energy_meter = EnergyMeter()
         self._client = client
 
+        self._update_listeners: List[Callable[["Device"], None]] = []
+        self._add_energy_reading()
+
+        self._full_state_writes = full_state_writes
+        self._conf_state_polling = conf_state_polling
+        self._circuit_breaker = CircuitBreaker(failure_threshold, clock=self._clock)
+        self._stale_after = stale_after
         self._set_debounce = set_debounce
         self._set_event = asyncio.Event()
         self._write_task: Optional[asyncio.Future[None]] = None
@@ -69,6 +152,120 @@ class Device(ABC):
             .quantize(Decimal('1'), rounding=ROUND_HALF_UP)
         ) * self.temperature_increment
 
+    def _capability_profile(self) -> Any:
+        """Return the capability profile of the current device conf.
+
+        The profile is derived once per device conf revision.
+        """
+        if self._capabilities_conf is not self._device_conf:
+            self._capabilities = self._build_capability_profile(self._device_conf)
+            self._capabilities_conf = self._device_conf
+        return self._capabilities
+
+    @abstractmethod
+    def _build_capability_profile(self, device_conf: Dict[str, Any]) -> Any:
+        """Build an immutable capability profile from a device conf.
+
+        Devices with identical capability flags should share the same profile.
+        """
+
+    def _set_state(self, state: Optional[Dict[str, Any]]) -> None:
+        """Replace the device state and the values derived from it."""
+        self._state = state
+        self._marked_stale = False
+        if state is None:
+            self._last_seen = None
+        else:
+            self._last_seen = _parse_timestamp(state.get("LastCommunication"))
+
+    def _set_energy_report(self, energy_report: Optional[Dict[str, Any]]) -> None:
+        """Replace the energy report and the daily consumption derived from it."""
+        self._energy_report = energy_report
+        if energy_report is None:
+            self._daily_energy_consumed = None
+            return
+
+        consumption = 0.0
+        for mode in _ENERGY_REPORT_MODES:
+            previous_reports = energy_report.get(mode, [0.0])
+            if previous_reports:
+                consumption += previous_reports[-1]
+        self._daily_energy_consumed = consumption
+
+    def _add_energy_reading(self) -> None:
+        """Feed the energy meter reading of the device conf to the energy meter.
+
+        The reading is reported in Wh.
+        """
+        reading = self.get_device_prop("CurrentEnergyConsumed")
+        if reading is not None:
+            self._energy_meter.add_reading(reading / 1000.0, datetime.now())
+
+    def _write_payload(
+        self, state: Dict[str, Any], written: Iterable[str]
+    ) -> Dict[str, Any]:
+        """Return the identity fields and the fields selected by EffectiveFlags.
+
+        MELCloud applies every field covered by a set flag, so fields sharing a
+        flag bit with a written one are posted from state, e.g. the Atw flow
+        temperatures with the tank temperature. The written fields are added on
+        top.
+        """
+        flags = state.get(EFFECTIVE_FLAGS, 0)
+        payload = {key: state.get(key) for key in _IDENTITY_FIELDS}
+        payload[EFFECTIVE_FLAGS] = flags
+        payload[HAS_PENDING_COMMAND] = state.get(HAS_PENDING_COMMAND, False)
+        for mask, keys in self._WRITE_FIELDS.items():
+            if flags & mask == mask:
+                for key in keys:
+                    payload[key] = state.get(key)
+        for key in written:
+            payload[key] = state.get(key)
+        return payload
+
+    def _conf_state(self) -> Optional[Dict[str, Any]]:
+        """Return the state fields mirrored in the device conf.
+
+        None is returned if any of the fields is missing from the conf.
+        """
+        device = self._device_conf.get("Device", {})
+        if any(key not in device for key in self._CONF_STATE_FIELDS.values()):
+            return None
+        return {
+            state_key: device[conf_key]
+            for state_key, conf_key in self._CONF_STATE_FIELDS.items()
+        }
+
+    async def _fetch_units(self) -> None:
+        try:
+            self._device_units = await self._client.fetch_device_units(self)
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning(
+                "Failed to fetch units of device %s: %s", self.device_id, ex
+            )
+        finally:
+            self._units_task = None
+
+    async def load_units(self) -> None:
+        """Load unit info now instead of on the first units read."""
+        if self._device_units is None:
+            self._load_units()
+        if self._units_task is not None:
+            await self._units_task
+
+    def _load_units(self) -> None:
+        """Load unit info from the client cache or start fetching it."""
+        if self.access_level == ACCESS_LEVEL.get("GUEST"):
+            return
+        self._device_units = self._client.cached_device_units(self.device_id)
+        if self._device_units is not None or self._units_task is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._units_task = asyncio.ensure_future(self._fetch_units())
+
     @abstractmethod
     def apply_write(self, state: Dict[str, Any], key: str, value: Any):
         """Apply writes to state object.
@@ -77,31 +274,137 @@ class Device(ABC):
         """
         pass
 
-    async def update(self):
+    async def update(self) -> None:
         """Fetch state of the device from MELCloud.
 
-        List of device_confs is also updated.
+        List of device_confs is also updated. Raises ValueError if the device has
+        been removed from the account. The update is skipped while the circuit of
+        a repeatedly failing device is open, see health.
+
+        With conf_state_polling, the state is refreshed from the device conf and
+        Device/Get is only called for the first update and when the conf lacks
+        some of the state fields.
 
         Please, rate limit calls to this method. Polling every 60 seconds should be
         enough to catch all events at the rate they are coming in to MELCloud with the
         exception of changes performed through MELCloud directly.
         """
         await self._client.update_confs()
-        self._device_conf = next(
-            c
-            for c in self._client.device_confs
-            if c.get("DeviceID") == self.device_id
-            and c.get("BuildingID") == self.building_id
+        device_conf = next(
+            (
+                c
+                for c in self._client.device_confs
+                if c.get("DeviceID") == self.device_id
+                and c.get("BuildingID") == self.building_id
+            ),
+            None,
         )
-        self._state = await self._client.fetch_device_state(self)
-        self._energy_report = await self._client.fetch_energy_report(self)
-
-        if self._device_units is None and self.access_level != ACCESS_LEVEL.get(
-            "GUEST"
+        if device_conf is None:
+            raise ValueError(f"Device removed from the account [{self.device_id}]")
+        self._device_conf = device_conf
+        self._add_energy_reading()
+
+        if not self._circuit_breaker.allow_request():
+            _LOGGER.debug("Skipping update of unavailable device %s", self.device_id)
+            return
+
+        requests = {"energy_report": self._client.fetch_energy_report(self)}
+
+        conf_timestamp = self.get_device_prop("LastTimeStamp")
+        conf_state = None
+        if self._conf_state_polling and self._state is not None:
+            conf_state = self._conf_state()
+
+        if conf_state is not None and self._state is not None:
+            # Fields missing from the conf are kept from the last Device/Get.
+            self._set_state({**self._state, **conf_state})
+        elif (
+            self._state is not None
+            and conf_timestamp is not None
+            and conf_timestamp == self._state_conf_timestamp
+            and self._client.conf_generation != self._state_conf_generation
         ):
-            self._device_units = await self._client.fetch_device_units(self)
+            # The conf has been refreshed since the state was last checked and the
+            # unit has not communicated with MELCloud in between.
+            self._skipped_state_fetches += 1
+            self._state_conf_generation = self._client.conf_generation
+        else:
+            requests["state"] = self._client.fetch_device_state(self)
+
+        results = dict(
+            zip(
+                requests,
+                await asyncio.gather(*requests.values(), return_exceptions=True),
+            )
+        )
+
+        # Keep whatever was fetched successfully. Only a failed state fetch fails
+        # the update, the energy report is retried on the next update.
+        energy_report = results["energy_report"]
+        if isinstance(energy_report, BaseException):
+            _LOGGER.warning(
+                "Failed to fetch energy report of device %s: %s",
+                self.device_id,
+                energy_report,
+            )
+        else:
+            self._set_energy_report(energy_report)
+
+        if "state" in results:
+            state = results["state"]
+            if isinstance(state, BaseException):
+                self._circuit_breaker.record_failure()
+                raise state
+            self._circuit_breaker.record_success()
+            if state is not self._state:
+                self._set_state(state)
+            self._marked_stale = False
+            self._state_conf_timestamp = conf_timestamp
+            self._state_conf_generation = self._client.conf_generation
+        self._state_updated_at = self._clock.monotonic()
+
+        for listener in list(self._update_listeners):
+            listener(self)
+
+    async def _refresh(self) -> None:
+        try:
+            await self.update()
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Failed to refresh device %s: %s", self.device_id, ex)
+        finally:
+            self._refresh_task = None
+
+    async def ensure_fresh(self) -> None:
+        """Make sure the state is recent enough to be read.
+
+        State younger than the soft TTL of the freshness policy is used as is. Older
+        state is used as well, but refreshed in the background. The update is
+        awaited only if there is no state or it is older than the hard TTL.
+        """
+        age = self.state_age
+        if age is not None and age <= self._freshness.hard_ttl:
+            if age > self._freshness.soft_ttl and self._refresh_task is None:
+                self._refresh_task = asyncio.ensure_future(self._refresh())
+            return
+
+        if self._refresh_task is not None:
+            await self._refresh_task
+            age = self.state_age
+            if age is not None and age <= self._freshness.hard_ttl:
+                return
+        await self.update()
+
+    def add_update_listener(
+        self, listener: Callable[["Device"], None]
+    ) -> Callable[[], None]:
+        """Register a listener called with the device after each update.
+
+        Returns a callable removing the listener.
+        """
+        self._update_listeners.append(listener)
+        return lambda: self._update_listeners.remove(listener)
 
-    async def set(self, properties: Dict[str, Any]):
+    async def set(self, properties: Dict[str, Any]) -> None:
         """Schedule property write to MELCloud."""
         if self._write_task is not None:
             self._write_task.cancel()
@@ -116,22 +419,43 @@ class Device(ABC):
         self._write_task = asyncio.ensure_future(self._write())
         await self._set_event.wait()
 
-    async def _write(self):
-        await asyncio.sleep(self._set_debounce.total_seconds())
+    async def _write(self) -> None:
+        await self._clock.sleep(self._set_debounce.total_seconds())
+        if self._conf_state_polling:
+            # The conf derived state can be stale, write on top of the real one.
+            self._set_state(
+                await self._client.fetch_device_state(
+                    self, priority=PRIORITY_INTERACTIVE_READ
+                )
+            )
+            self._state_conf_timestamp = self.get_device_prop("LastTimeStamp")
+            self._state_conf_generation = self._client.conf_generation
         new_state = self._state.copy()
+        written: Set[str] = set()
 
         for k, value in self._pending_writes.items():
+            fields = {EFFECTIVE_FLAGS: new_state.get(EFFECTIVE_FLAGS, 0)}
             if k == PROPERTY_POWER:
-                new_state["Power"] = value
-                new_state[EFFECTIVE_FLAGS] = new_state.get(EFFECTIVE_FLAGS, 0) | 0x01
+                fields["Power"] = value
+                fields[EFFECTIVE_FLAGS] |= 0x01
             else:
-                self.apply_write(new_state, k, value)
+                self.apply_write(fields, k, value)
+            new_state.update(fields)
+            written.update(fields)
+        written.discard(EFFECTIVE_FLAGS)
 
         if new_state[EFFECTIVE_FLAGS] != 0:
             new_state.update({HAS_PENDING_COMMAND: True})
 
         self._pending_writes = {}
-        self._state = await self._client.set_device_state(new_state)
+        if self._full_state_writes:
+            self._set_state(await self._client.set_device_state(new_state))
+        else:
+            response = await self._client.set_device_state(
+                self._write_payload(new_state, written)
+            )
+            self._set_state({**self._state, **response})
+        self._state_updated_at = self._clock.monotonic()
         self._set_event.set()
         self._set_event.clear()
 
@@ -150,7 +474,13 @@ class Device(ABC):
 
     @property
     def units(self) -> Optional[List[dict]]:
-        """Return device model info."""
+        """Return device model info.
+
+        The info is loaded on first access. None is returned while it is being
+        fetched from MELCloud and for guest devices.
+        """
+        if self._device_units is None:
+            self._load_units()
         if self._device_units is None:
             return None
 
@@ -183,11 +513,41 @@ class Device(ABC):
 
         The timestamp is in UTC.
         """
-        if self._state is None:
+        return self._last_seen
+
+    def mark_stale(self) -> None:
+        """Report the state as stale in health until the next state update."""
+        self._marked_stale = True
+
+    @property
+    def state_age(self) -> Optional[timedelta]:
+        """Return time since the state was last fetched or None if never fetched."""
+        if self._state_updated_at is None:
             return None
-        return datetime.strptime(
-            self._state.get("LastCommunication"), "%Y-%m-%dT%H:%M:%S.%f"
-        ).replace(tzinfo=timezone.utc)
+        return timedelta(seconds=self._clock.monotonic() - self._state_updated_at)
+
+    @property
+    def health(self) -> DeviceHealth:
+        """Return health of the device.
+
+        Updates are skipped while circuit_open is True, except for periodic probes.
+        """
+        return DeviceHealth(
+            consecutive_failures=self._circuit_breaker.consecutive_failures,
+            circuit_open=self._circuit_breaker.is_open,
+            has_error=self.has_error,
+            error_code=self.error_code,
+            stale=self._marked_stale or is_stale(self._last_seen, self._stale_after),
+        )
+
+    @property
+    def skipped_state_fetches(self) -> int:
+        """Return the number of state fetches skipped due to an unchanged conf.
+
+        A fetch is skipped when the device conf has been refreshed since the previous
+        fetch and its last communication timestamp has not advanced.
+        """
+        return self._skipped_state_fetches
 
     @property
     def power(self) -> Optional[bool]:
@@ -212,20 +572,16 @@ class Device(ABC):
         TLDR: Request some days from the past and some days from the future -> receive
         the latest day bucket.
         """
-        if self._energy_report is None:
-            return None
-
-        consumption = 0
+        return self._daily_energy_consumed
 
-        for mode in ['Heating', 'Cooling', 'Auto', 'Dry', 'Fan', 'Other']:
-            previous_reports = self._energy_report.get(mode, [0.0])
-            if previous_reports:
-                last_report = previous_reports[-1]
-            else:
-                last_report = 0.0
-            consumption += last_report
+    @property
+    def energy_meter(self) -> EnergyMeter:
+        """Return the energy meter integrating the device energy consumption.
 
-        return consumption
+        The meter provides daily, weekly and monthly aggregates of the consumption
+        observed by this instance. Use EnergyStore to persist it across restarts.
+        """
+        return self._energy_meter
 
     @property
     def wifi_signal(self) -> Optional[int]:
@@ -0,0 +1,375 @@
+"""Energy accounting."""
+import asyncio
+import logging
+import math
+from datetime import date, datetime, timedelta
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from pymelcloud.clock import Clock, MonotonicClock
+from pymelcloud.storage import JsonStore
+
+if TYPE_CHECKING:
+    from pymelcloud.client import Client
+    from pymelcloud.device import Device
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _day_key(day: date) -> str:
+    return day.isoformat()
+
+
+def _week_key(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _month_key(day: date) -> str:
+    return f"{day.year}-{day.month:02d}"
+
+
+class EnergyMeter:
+    """Running energy totals integrated from a cumulative meter reading.
+
+    MELCloud reports the lifetime energy consumption of some devices as a counter
+    that is updated every couple of hours. The counter occasionally reads zero and
+    can be reset by the device. The meter integrates the positive deltas between
+    readings so that the total keeps increasing across resets:
+
+      - The first reading is used as the starting total.
+      - Zero readings are ignored.
+      - A reading lower than the previous one is counted as a reset and the new
+        reading is added as consumption since the reset.
+      - Readings further apart than gap_threshold are counted as gaps. The delta is
+        still added, but it is attributed to the day of the later reading.
+
+    Daily, weekly and monthly consumption is aggregated as readings are added. Only
+    the most recent buckets are kept, older ones are pruned.
+    """
+
+    def __init__(
+        self,
+        *,
+        gap_threshold: timedelta = timedelta(hours=6),
+        daily_buckets: int = 62,
+        weekly_buckets: int = 106,
+        monthly_buckets: int = 36,
+    ):
+        """Initialize an empty meter.
+
+        Keyword arguments:
+            gap_threshold -- time between readings counted as a gap.
+            (default = 6 h)
+            daily_buckets -- number of days kept. (default = 62)
+            weekly_buckets -- number of ISO weeks kept. (default = 106)
+            monthly_buckets -- number of months kept. (default = 36)
+        """
+        self._gap_threshold = gap_threshold
+        self._bucket_limits = (daily_buckets, weekly_buckets, monthly_buckets)
+        self._total: Optional[float] = None
+        self._last_reading: Optional[float] = None
+        self._last_timestamp: Optional[datetime] = None
+        self._resets = 0
+        self._gaps = 0
+        self._daily: Dict[str, float] = {}
+        self._weekly: Dict[str, float] = {}
+        self._monthly: Dict[str, float] = {}
+
+    @property
+    def total(self) -> Optional[float]:
+        """Return total consumed energy in kWh."""
+        return self._total
+
+    @property
+    def resets(self) -> int:
+        """Return number of detected meter resets."""
+        return self._resets
+
+    @property
+    def gaps(self) -> int:
+        """Return number of detected gaps between readings."""
+        return self._gaps
+
+    def add_reading(self, reading: Optional[float], timestamp: datetime) -> None:
+        """Integrate a cumulative meter reading in kWh taken at timestamp."""
+        if reading is None or reading == 0.0:
+            return
+
+        if self._last_reading is None:
+            self._total = reading
+            self._last_reading = reading
+            self._last_timestamp = timestamp
+            return
+
+        if reading < self._last_reading:
+            self._resets += 1
+            delta = reading
+        else:
+            delta = reading - self._last_reading
+
+        if (
+            self._last_timestamp is not None
+            and timestamp - self._last_timestamp > self._gap_threshold
+        ):
+            self._gaps += 1
+
+        self._last_reading = reading
+        self._last_timestamp = timestamp
+        if delta == 0.0:
+            return
+
+        self._total = (self._total or 0.0) + delta
+        day = timestamp.date()
+        for buckets, key in zip(
+            self._buckets(), (_day_key(day), _week_key(day), _month_key(day))
+        ):
+            if key not in buckets:
+                buckets[key] = 0.0
+                self._prune()
+            buckets[key] += delta
+
+    def _buckets(self) -> Tuple[Dict[str, float], ...]:
+        return self._daily, self._weekly, self._monthly
+
+    def _prune(self) -> None:
+        """Drop the oldest buckets exceeding the limits."""
+        for buckets, limit in zip(self._buckets(), self._bucket_limits):
+            # The keys sort chronologically.
+            for key in sorted(buckets)[: max(len(buckets) - limit, 0)]:
+                del buckets[key]
+
+    def daily(self, day: date) -> float:
+        """Return energy consumed during a day in kWh."""
+        return self._daily.get(_day_key(day), 0.0)
+
+    def weekly(self, day: date) -> float:
+        """Return energy consumed during the ISO week of a day in kWh."""
+        return self._weekly.get(_week_key(day), 0.0)
+
+    def monthly(self, day: date) -> float:
+        """Return energy consumed during the month of a day in kWh."""
+        return self._monthly.get(_month_key(day), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON serializable representation of the meter."""
+        return {
+            "total": self._total,
+            "last_reading": self._last_reading,
+            "last_timestamp": (
+                None
+                if self._last_timestamp is None
+                else self._last_timestamp.isoformat()
+            ),
+            "resets": self._resets,
+            "gaps": self._gaps,
+            "daily": dict(self._daily),
+            "weekly": dict(self._weekly),
+            "monthly": dict(self._monthly),
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Restore the meter from a to_dict representation."""
+        self._total = data.get("total")
+        self._last_reading = data.get("last_reading")
+        last_timestamp = data.get("last_timestamp")
+        self._last_timestamp = (
+            None if last_timestamp is None else datetime.fromisoformat(last_timestamp)
+        )
+        self._resets = data.get("resets", 0)
+        self._gaps = data.get("gaps", 0)
+        self._daily = dict(data.get("daily", {}))
+        self._weekly = dict(data.get("weekly", {}))
+        self._monthly = dict(data.get("monthly", {}))
+        self._prune()
+
+
+class EnergyStore:
+    """Persist device energy meters across restarts.
+
+    The meters of attached devices are restored from the store. Device updates
+    mark the store dirty and the meters are written in one batch flush_interval
+    after the first unsaved update. The file is written in an executor to keep
+    the event loop responsive. Call flush before shutting down to save the latest
+    readings.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        flush_interval: timedelta = timedelta(minutes=5),
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize a store backed by a JSON file.
+
+        Keyword arguments:
+            flush_interval -- delay between an update and writing the file.
+            (default = 5 min)
+            clock -- clock timing the flushes. (default = monotonic)
+        """
+        self._store = JsonStore(path)
+        self._flush_interval = flush_interval
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._data: Optional[Dict[str, Any]] = None
+        self._dirty: Dict[str, EnergyMeter] = {}
+        self._flush_task: Optional[asyncio.Future[None]] = None
+        self._lock = asyncio.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = self._store.load()
+        return self._data
+
+    def attach(self, device: "Device") -> Callable[[], None]:
+        """Restore the energy meter of a device and save it after each update.
+
+        Returns a callable detaching the store from the device.
+        """
+        saved = self._load().get(str(device.device_id))
+        if saved is not None:
+            device.energy_meter.restore(saved)
+        return device.add_update_listener(self.save)
+
+    def save(self, device: "Device") -> None:
+        """Schedule saving the energy meter of a device."""
+        self._dirty[str(device.device_id)] = device.energy_meter
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        try:
+            await self._clock.sleep(self._flush_interval.total_seconds())
+        finally:
+            self._flush_task = None
+        try:
+            await self.flush()
+        except OSError as ex:
+            _LOGGER.warning("Failed to save energy meters: %s", ex)
+
+    async def flush(self) -> None:
+        """Write the meters saved since the previous flush to the file."""
+        async with self._lock:
+            if not self._dirty:
+                return
+            data = self._load()
+            for device_id, meter in self._dirty.items():
+                data[device_id] = meter.to_dict()
+            self._dirty = {}
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._store.save, dict(data)
+            )
+
+
+class EnergyTotals(NamedTuple):
+    """Energy consumption rolled up over a group of devices in kWh."""
+
+    daily_energy_consumed: float
+    total_energy_consumed: float
+
+
+_NO_ENERGY = EnergyTotals(0.0, 0.0)
+
+_NODE_BUILDING = "building"
+_NODE_FLOOR = "floor"
+_NODE_AREA = "area"
+
+
+class EnergyAggregator:
+    """Energy consumption rolled up per building, floor and area.
+
+    The contribution of an attached device is updated after each device update and
+    the building, floor and area containing the device are summed again from the
+    contributions of their devices. Queries do not touch the devices.
+    """
+
+    def __init__(self, client: "Client"):
+        """Initialize an aggregator using the device locations of a Client."""
+        self._client = client
+        self._totals: Dict[Tuple[str, Any], EnergyTotals] = {}
+        self._members: Dict[Tuple[str, Any], Set[Any]] = {}
+        self._contributions: Dict[Any, Tuple[Tuple[Any, ...], EnergyTotals]] = {}
+
+    def attach(self, device: "Device") -> Callable[[], None]:
+        """Include the device in the aggregates.
+
+        Returns a callable detaching the device and removing its contribution.
+        """
+        self.update(device)
+        remove_listener = device.add_update_listener(self.update)
+
+        def detach() -> None:
+            remove_listener()
+            self.remove(device.device_id)
+
+        return detach
+
+    def _sum(self, nodes: Tuple[Any, ...]) -> None:
+        # Summing instead of applying differences keeps the totals free of
+        # accumulated rounding errors, e.g. an emptied node is exactly 0.
+        for node in nodes:
+            members = self._members.get(node)
+            if not members:
+                self._members.pop(node, None)
+                self._totals.pop(node, None)
+                continue
+            contributions = [self._contributions[member][1] for member in members]
+            self._totals[node] = EnergyTotals(
+                math.fsum(c.daily_energy_consumed for c in contributions),
+                math.fsum(c.total_energy_consumed for c in contributions),
+            )
+
+    def update(self, device: "Device") -> None:
+        """Update the contribution of a device."""
+        location = self._client.device_locations.get(device.device_id)
+        if location is None:
+            nodes: Tuple[Any, ...] = ((_NODE_BUILDING, device.building_id),)
+        else:
+            nodes = tuple(
+                (kind, node_id)
+                for kind, node_id in (
+                    (_NODE_BUILDING, location.building_id),
+                    (_NODE_FLOOR, location.floor_id),
+                    (_NODE_AREA, location.area_id),
+                )
+                if node_id is not None
+            )
+        contribution = EnergyTotals(
+            device.daily_energy_consumed or 0.0,
+            device.energy_meter.total or 0.0,
+        )
+
+        self.remove(device.device_id)
+        self._contributions[device.device_id] = (nodes, contribution)
+        for node in nodes:
+            self._members.setdefault(node, set()).add(device.device_id)
+        self._sum(nodes)
+
+    def remove(self, device_id: Any) -> None:
+        """Remove the contribution of a device."""
+        previous = self._contributions.pop(device_id, None)
+        if previous is not None:
+            nodes, _ = previous
+            for node in nodes:
+                self._members.get(node, set()).discard(device_id)
+            self._sum(nodes)
+
+    def building(self, building_id: Any) -> EnergyTotals:
+        """Return energy consumption of the devices in a building."""
+        return self._totals.get((_NODE_BUILDING, building_id), _NO_ENERGY)
+
+    def floor(self, floor_id: Any) -> EnergyTotals:
+        """Return energy consumption of the devices on a floor."""
+        return self._totals.get((_NODE_FLOOR, floor_id), _NO_ENERGY)
+
+    def area(self, area_id: Any) -> EnergyTotals:
+        """Return energy consumption of the devices in an area."""
+        return self._totals.get((_NODE_AREA, area_id), _NO_ENERGY)
@@ -1,5 +1,6 @@
 """Energy-Recovery-Ventilation (DeviceType=3) device definition."""
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 from pymelcloud.device import EFFECTIVE_FLAGS, Device
 
@@ -48,9 +49,44 @@ def _ventilation_mode_to(mode: str) -> int:
     raise ValueError(f"Invalid ventilation_mode [{mode}]")
 
 
+@lru_cache(maxsize=None)
+def _fan_speeds(num_fan_speeds: int) -> Tuple[str, ...]:
+    return tuple(_fan_speed_from(num) for num in range(1, num_fan_speeds + 1))
+
+
+class _ErvCapabilities(NamedTuple):
+    """Capabilities of an ERV device derived from the device conf."""
+
+    ventilation_modes: Tuple[str, ...]
+
+
+@lru_cache(maxsize=None)
+def _erv_capabilities(has_bypass: bool, has_auto: bool) -> _ErvCapabilities:
+    modes: Tuple[str, ...] = (VENTILATION_MODE_RECOVERY,)
+    if has_bypass:
+        modes += (VENTILATION_MODE_BYPASS,)
+    if has_auto:
+        modes += (VENTILATION_MODE_AUTO,)
+    return _ErvCapabilities(ventilation_modes=modes)
+
+
 class ErvDevice(Device):
     """Energy-Recovery-Ventilation device."""
 
+    _WRITE_FIELDS = {
+        **Device._WRITE_FIELDS,
+        0x04: ("VentilationMode",),
+        0x08: ("SetFanSpeed",),
+    }
+
+    _CONF_STATE_FIELDS = {
+        **Device._CONF_STATE_FIELDS,
+        "VentilationMode": "VentilationMode",
+        "RoomTemperature": "RoomTemperature",
+        "OutdoorTemperature": "OutdoorTemperature",
+        "SetFanSpeed": "SetFanSpeed",
+    }
+
     def apply_write(self, state: Dict[str, Any], key: str, value: Any):
         """Apply writes to state object.
 
@@ -69,6 +105,15 @@ class ErvDevice(Device):
 
         state[EFFECTIVE_FLAGS] = flags
 
+    def _build_capability_profile(
+        self, device_conf: Dict[str, Any]
+    ) -> _ErvCapabilities:
+        device = device_conf.get("Device", {})
+        return _erv_capabilities(
+            bool(device.get("HasBypassVentilationMode", False)),
+            bool(device.get("HasAutoVentilationMode", False)),
+        )
+
     def _device(self) -> Dict[str, Any]:
         return self._device_conf.get("Device", {})
 
@@ -85,13 +130,10 @@ class ErvDevice(Device):
 
         The update interval is extremely slow and inconsistent. Empirical evidence
         suggests can vary between 1h 30min and 3h.
+
+        Occasional zero readings and meter resets are handled by the energy meter.
         """
-        if self._device_conf is None:
-            return None
-        reading = self._device().get("CurrentEnergyConsumed", None)
-        if reading is None:
-            return None
-        return reading / 1000.0
+        return self._energy_meter.total
 
     @property
     def presets(self) -> List[Dict[Any, Any]]:
@@ -195,7 +237,7 @@ class ErvDevice(Device):
         return self._device().get("RoomCO2Level", None)
 
     @property
-    def fan_speeds(self) -> Optional[List[str]]:
+    def fan_speeds(self) -> Optional[Tuple[str, ...]]:
         """Return available fan speeds.
 
         The supported fan speeds vary from device to device. The available modes are
@@ -216,25 +258,9 @@ class ErvDevice(Device):
         """
         if self._state is None:
             return None
-        speeds = []
-
-        num_fan_speeds = self._state.get("NumberOfFanSpeeds", 0)
-        for num in range(1, num_fan_speeds + 1):
-            speeds.append(_fan_speed_from(num))
-
-        return speeds
+        return _fan_speeds(self._state.get("NumberOfFanSpeeds", 0))
 
     @property
-    def ventilation_modes(self) -> List[str]:
+    def ventilation_modes(self) -> Tuple[str, ...]:
         """Return available ventilation modes."""
-        modes: List[str] = [VENTILATION_MODE_RECOVERY]
-
-        device = self._device()
-
-        if device.get("HasBypassVentilationMode", False):
-            modes.append(VENTILATION_MODE_BYPASS)
-
-        if device.get("HasAutoVentilationMode", False):
-            modes.append(VENTILATION_MODE_AUTO)
-
-        return modes
+        return self._capability_profile().ventilation_modes
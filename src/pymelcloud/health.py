@@ -0,0 +1,94 @@
+"""Device health tracking."""
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple, Optional
+
+from pymelcloud.clock import Clock, MonotonicClock
+
+
+class CircuitBreaker:
+    """Consecutive failure counter skipping requests to failing devices.
+
+    The circuit opens after failure_threshold consecutive failures. While open, a
+    single probe request is allowed once the probe interval has elapsed. The
+    interval starts at probe_interval and doubles after each failed probe up to
+    max_probe_interval. A successful request closes the circuit.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        *,
+        probe_interval: timedelta = timedelta(minutes=1),
+        max_probe_interval: timedelta = timedelta(minutes=30),
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize a closed circuit.
+
+        A failure_threshold of 0 disables the breaker.
+        """
+        if failure_threshold < 0:
+            raise ValueError(f"Invalid failure threshold [{failure_threshold}]")
+        self._failure_threshold = failure_threshold
+        self._probe_interval = probe_interval.total_seconds()
+        self._max_probe_interval = max_probe_interval.total_seconds()
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._failures = 0
+        self._next_probe: Optional[float] = None
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return number of failed requests since the last success."""
+        return self._failures
+
+    @property
+    def is_open(self) -> bool:
+        """Return True if requests are being skipped."""
+        return self._next_probe is not None
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent now."""
+        return self._next_probe is None or self._clock.monotonic() >= self._next_probe
+
+    def record_success(self) -> None:
+        """Close the circuit."""
+        self._failures = 0
+        self._next_probe = None
+
+    def record_failure(self) -> None:
+        """Count a failure and schedule the next probe if the circuit is open."""
+        self._failures += 1
+        if self._failure_threshold == 0 or self._failures < self._failure_threshold:
+            return
+        interval = min(
+            self._probe_interval * 2 ** (self._failures - self._failure_threshold),
+            self._max_probe_interval,
+        )
+        self._next_probe = self._clock.monotonic() + interval
+
+
+class FreshnessPolicy(NamedTuple):
+    """Maximum age of device state served by Device.ensure_fresh.
+
+    State older than soft_ttl is served while it is refreshed in the background.
+    State older than hard_ttl is refreshed before returning.
+    """
+
+    soft_ttl: timedelta = timedelta(minutes=1)
+    hard_ttl: timedelta = timedelta(minutes=10)
+
+
+class DeviceHealth(NamedTuple):
+    """Health of a device."""
+
+    consecutive_failures: int
+    circuit_open: bool
+    has_error: bool
+    error_code: Optional[Any]
+    stale: bool
+
+
+def is_stale(last_seen: Optional[datetime], stale_after: timedelta) -> bool:
+    """Return True if a device has not communicated within stale_after."""
+    if last_seen is None:
+        return False
+    return datetime.now(timezone.utc) - last_seen > stale_after
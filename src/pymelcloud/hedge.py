@@ -0,0 +1,111 @@
+"""Hedged requests."""
+import asyncio
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """Send a duplicate of a slow read request and use whichever answers first.
+
+    A request is hedged if it has not answered within the given percentile of the
+    recent request latencies. Each request earns budget hedge tokens and a hedge
+    spends one, so at most a budget fraction of the requests are duplicated.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay: timedelta = timedelta(milliseconds=50),
+        max_tokens: float = 10.0,
+    ):
+        """Initialize a hedge policy.
+
+        Keyword arguments:
+            percentile -- latency percentile after which a request is hedged.
+            (default = 0.95)
+            budget -- hedges allowed per request on average. (default = 0.05)
+            window -- number of recent latencies the percentile is taken from.
+            (default = 200)
+            min_samples -- latencies needed before hedging starts. (default = 20)
+            min_delay -- lower bound of the hedge delay. (default = 50 ms)
+            max_tokens -- maximum number of hedges in a burst. (default = 10)
+        """
+        if not 0.0 < percentile < 1.0:
+            raise ValueError(f"Invalid hedge percentile [{percentile}]")
+        if budget < 0.0:
+            raise ValueError(f"Invalid hedge budget [{budget}]")
+        self._percentile = percentile
+        self._budget = budget
+        self._min_samples = min_samples
+        self._min_delay = min_delay.total_seconds()
+        self._max_tokens = max_tokens
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._tokens = 0.0
+        self._hedges = 0
+
+    @property
+    def hedges(self) -> int:
+        """Return number of hedged requests sent."""
+        return self._hedges
+
+    def delay(self) -> Optional[float]:
+        """Return seconds to wait before hedging or None if not enough samples."""
+        if len(self._latencies) < self._min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        index = int(self._percentile * (len(latencies) - 1))
+        return max(latencies[index], self._min_delay)
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a completed request in seconds."""
+        self._latencies.append(latency)
+
+    def _earn(self) -> None:
+        self._tokens = min(self._tokens + self._budget, self._max_tokens)
+
+    def _spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        self._hedges += 1
+        return True
+
+    async def run(self, send: Callable[[], Awaitable[T]]) -> T:
+        """Run send and hedge it with a second call if it is slow.
+
+        The first successful result is returned and the other call is cancelled.
+        If both calls fail, the error of the last one is raised.
+        """
+        self._earn()
+        start = time.monotonic()
+        tasks = {asyncio.ensure_future(send())}
+        error: Optional[BaseException] = None
+        try:
+            delay = self.delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._spend():
+                    tasks.add(asyncio.ensure_future(send()))
+
+            while True:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        self.record(time.monotonic() - start)
+                        return task.result()
+                if not tasks and error is not None:
+                    raise error
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,260 @@
+"""Local telemetry history for devices."""
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymelcloud.device import Device
+
+_MAGIC = b"PMTS"
+_HEADER = struct.Struct("<4sIII")  # magic, capacity, next write index, count
+_SAMPLE = struct.Struct("<dd")  # unix timestamp, value
+
+DEFAULT_CAPACITY = 60 * 24 * 7 * 4  # Four weeks of one minute polls.
+
+
+def _zone_flow_temperature(device: Device) -> Optional[float]:
+    return device.get_device_prop("FlowTemperature")
+
+
+def _zone_return_temperature(device: Device) -> Optional[float]:
+    return device.get_device_prop("ReturnTemperature")
+
+
+def _property(name: str) -> Callable[[Device], Any]:
+    return lambda device: getattr(device, name, None)
+
+
+DEFAULT_FIELDS: Dict[str, Callable[[Device], Any]] = {
+    "room_temperature": _property("room_temperature"),
+    "target_temperature": _property("target_temperature"),
+    "outdoor_temperature": _property("outdoor_temperature"),
+    "outside_temperature": _property("outside_temperature"),
+    "tank_temperature": _property("tank_temperature"),
+    "flow_temperature": _zone_flow_temperature,
+    "return_temperature": _zone_return_temperature,
+    "wifi_signal": _property("wifi_signal"),
+    "total_energy_consumed": _property("total_energy_consumed"),
+    "daily_energy_consumed": _property("daily_energy_consumed"),
+}
+
+
+class RingBuffer:
+    """Fixed capacity buffer of (timestamp, value) samples in a memory-mapped file.
+
+    The oldest samples are overwritten once the buffer is full.
+    """
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY):
+        """Open a ring buffer file, creating it if it does not exist."""
+        if not os.path.exists(path):
+            with open(path, "wb") as file:
+                file.write(_HEADER.pack(_MAGIC, capacity, 0, 0))
+                file.truncate(_HEADER.size + capacity * _SAMPLE.size)
+
+        self._file = open(path, "r+b")  # pylint: disable=consider-using-with
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        header: Tuple[bytes, int, int, int] = _HEADER.unpack_from(self._mmap)
+        magic, self._capacity, self._head, self._count = header
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"Invalid ring buffer file [{path}]")
+
+    @property
+    def capacity(self) -> int:
+        """Return the maximum number of samples held by the buffer."""
+        return self._capacity
+
+    def __len__(self) -> int:
+        """Return the number of samples in the buffer."""
+        return self._count
+
+    def _offset(self, index: int) -> int:
+        """Return file offset of the index-th oldest sample."""
+        start = self._head - self._count
+        return _HEADER.size + ((start + index) % self._capacity) * _SAMPLE.size
+
+    def _timestamp(self, index: int) -> float:
+        timestamp: float = _SAMPLE.unpack_from(self._mmap, self._offset(index))[0]
+        return timestamp
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Append a sample, overwriting the oldest one if the buffer is full."""
+        _SAMPLE.pack_into(
+            self._mmap, _HEADER.size + self._head * _SAMPLE.size, timestamp, value
+        )
+        self._head = (self._head + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+        _HEADER.pack_into(
+            self._mmap, 0, _MAGIC, self._capacity, self._head, self._count
+        )
+
+    def last(self) -> Optional[Tuple[float, float]]:
+        """Return the latest sample."""
+        if self._count == 0:
+            return None
+        return _SAMPLE.unpack_from(self._mmap, self._offset(self._count - 1))
+
+    def samples(
+        self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> List[Tuple[float, float]]:
+        """Return samples with start <= timestamp <= end in chronological order."""
+        indices = range(self._count)
+        first = 0 if start is None else bisect_left(indices, start, key=self._timestamp)
+        last = (
+            self._count
+            if end is None
+            else bisect_right(indices, end, key=self._timestamp)
+        )
+        return [
+            _SAMPLE.unpack_from(self._mmap, self._offset(index))
+            for index in range(first, last)
+        ]
+
+    def flush(self) -> None:
+        """Flush written samples to disk."""
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """Close the buffer."""
+        self._mmap.close()
+        self._file.close()
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    return value.timestamp()
+
+
+class TelemetryRecorder:
+    """Append-only history of device telemetry.
+
+    Changed values are appended to a ring buffer file per device and field after
+    each device update. The buffers are stored under the given directory as
+    <device_id>/<field>.ring.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        fields: Optional[Dict[str, Callable[[Device], Any]]] = None,
+    ):
+        """Initialize a recorder.
+
+        Keyword arguments:
+            capacity -- samples kept per device and field. (default = 4 weeks/1 min)
+            fields -- value getters keyed by field name. (default = DEFAULT_FIELDS)
+        """
+        self._directory = directory
+        self._capacity = capacity
+        self._fields = DEFAULT_FIELDS if fields is None else fields
+        self._buffers: Dict[Tuple[Any, str], RingBuffer] = {}
+
+    def attach(self, device: Device) -> Callable[[], None]:
+        """Record the device after each update.
+
+        Returns a callable detaching the recorder from the device.
+        """
+        return device.add_update_listener(self.record)
+
+    def _path(self, device_id: Any, field: str) -> str:
+        return os.path.join(self._directory, str(device_id), f"{field}.ring")
+
+    def _buffer(self, device_id: Any, field: str) -> RingBuffer:
+        key = (device_id, field)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            path = self._path(device_id, field)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            buffer = RingBuffer(path, self._capacity)
+            self._buffers[key] = buffer
+        return buffer
+
+    def _samples(
+        self,
+        device_id: Any,
+        field: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> List[Tuple[float, float]]:
+        """Return recorded samples without creating a buffer for unknown fields."""
+        if (device_id, field) not in self._buffers and not os.path.exists(
+            self._path(device_id, field)
+        ):
+            return []
+        return self._buffer(device_id, field).samples(
+            _timestamp(start), _timestamp(end)
+        )
+
+    def record(self, device: Device, timestamp: Optional[datetime] = None) -> None:
+        """Append the current values of the device that differ from the last sample.
+
+        Non-numeric and missing values are ignored.
+        """
+        now = time.time() if timestamp is None else timestamp.timestamp()
+        for field, getter in self._fields.items():
+            value = getter(device)
+            if not isinstance(value, (int, float)):
+                continue
+            buffer = self._buffer(device.device_id, field)
+            last = buffer.last()
+            if last is None or last[1] != value:
+                buffer.append(now, float(value))
+
+    def query(
+        self,
+        device_id: Any,
+        field: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, float]]:
+        """Return recorded samples of a device field between start and end."""
+        return [
+            (datetime.fromtimestamp(ts, timezone.utc), value)
+            for ts, value in self._samples(device_id, field, start, end)
+        ]
+
+    def downsample(
+        self,
+        device_id: Any,
+        field: str,
+        interval: timedelta,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Tuple[datetime, float]]:
+        """Return the mean of recorded samples per interval.
+
+        Buckets are aligned to the unix epoch and labeled with their start time.
+        Buckets without samples are omitted.
+        """
+        step = interval.total_seconds()
+        if step <= 0:
+            raise ValueError(f"Invalid downsample interval [{interval}]")
+
+        buckets: Dict[float, List[float]] = {}
+        for ts, value in self._samples(device_id, field, start, end):
+            bucket = buckets.setdefault(ts - ts % step, [0.0, 0.0])
+            bucket[0] += value
+            bucket[1] += 1
+
+        return [
+            (datetime.fromtimestamp(ts, timezone.utc), total / count)
+            for ts, (total, count) in buckets.items()
+        ]
+
+    def flush(self) -> None:
+        """Flush all open buffers to disk."""
+        for buffer in self._buffers.values():
+            buffer.flush()
+
+    def close(self) -> None:
+        """Close all open buffers."""
+        for buffer in self._buffers.values():
+            buffer.close()
+        self._buffers = {}
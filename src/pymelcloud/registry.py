@@ -0,0 +1,255 @@
+"""Registry of the devices of an account."""
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Type
+
+from pymelcloud.ata_device import AtaDevice
+from pymelcloud.atw_device import AtwDevice
+from pymelcloud.client import Client, diff_confs
+from pymelcloud.const import (
+    DEVICE_TYPE_ATA,
+    DEVICE_TYPE_ATW,
+    DEVICE_TYPE_ERV,
+    DEVICE_TYPE_LOOKUP,
+    DEVICE_TYPE_UNKNOWN,
+)
+from pymelcloud.device import Device
+from pymelcloud.erv_device import ErvDevice
+from pymelcloud.health import FreshnessPolicy
+
+_LOGGER = logging.getLogger(__name__)
+
+DEVICE_CLASSES: Dict[str, Type[Device]] = {
+    DEVICE_TYPE_ATA: AtaDevice,
+    DEVICE_TYPE_ATW: AtwDevice,
+    DEVICE_TYPE_ERV: ErvDevice,
+}
+
+
+def device_type(conf: Dict[str, Any]) -> str:
+    """Return device type of a device conf."""
+    return DEVICE_TYPE_LOOKUP.get(
+        conf.get("Device", {}).get("DeviceType"), DEVICE_TYPE_UNKNOWN
+    )
+
+
+def classify_confs(
+    confs: Iterable[Dict[str, Any]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Group device confs by device type in a single pass.
+
+    Confs with an unknown device type are grouped under DEVICE_TYPE_UNKNOWN.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {
+        **{key: [] for key in DEVICE_CLASSES},
+        DEVICE_TYPE_UNKNOWN: [],
+    }
+    for conf in confs:
+        groups[device_type(conf)].append(conf)
+    return groups
+
+
+EVENT_DEVICE_ADDED = "device_added"
+EVENT_DEVICE_REMOVED = "device_removed"
+EVENT_DEVICE_CHANGED = "device_changed"
+
+
+class RegistryChanges(NamedTuple):
+    """Devices added, removed and changed by a registry sync."""
+
+    added: List[Device]
+    removed: List[Device]
+    changed: List[Device]
+
+
+class DeviceRegistry:
+    """Devices of a Client grouped by device type.
+
+    sync creates devices for confs that have appeared in Client.device_confs and
+    retires the devices whose confs have disappeared. Existing devices are kept, so
+    their state and listeners survive the sync. Listeners are called with
+    (event, device) for each added, removed and changed device. A device is changed
+    when its name, location, access level or capabilities change, not when its
+    readings do.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        *,
+        device_set_debounce: timedelta = timedelta(seconds=1),
+        full_state_writes: bool = False,
+        conf_state_polling: bool = False,
+        failure_threshold: int = 3,
+        freshness: FreshnessPolicy = FreshnessPolicy(),
+    ):
+        """Initialize an empty registry."""
+        self._client = client
+        self._device_set_debounce = device_set_debounce
+        self._full_state_writes = full_state_writes
+        self._conf_state_polling = conf_state_polling
+        self._failure_threshold = failure_threshold
+        self._freshness = freshness
+        self._confs: List[Dict[str, Any]] = []
+        self._devices: Dict[str, Dict[Any, Device]] = {
+            key: {} for key in DEVICE_CLASSES
+        }
+        self._unknown: Dict[Any, Any] = {}
+        self._listeners: List[Callable[[str, Device], None]] = []
+        self._warm_up_failures: Dict[Any, BaseException] = {}
+
+    @property
+    def devices(self) -> Dict[str, List[Device]]:
+        """Return devices grouped by device type."""
+        return {key: list(devices.values()) for key, devices in self._devices.items()}
+
+    @property
+    def unknown_devices(self) -> Dict[Any, Any]:
+        """Return raw DeviceType of devices with an unsupported type by device id."""
+        return dict(self._unknown)
+
+    @property
+    def warm_up_failures(self) -> Dict[Any, BaseException]:
+        """Return the errors of the devices that failed the last warm_up by id."""
+        return dict(self._warm_up_failures)
+
+    async def warm_up(self, *, limit: int = 8) -> Dict[Any, BaseException]:
+        """Update all devices and load their units concurrently.
+
+        Failures are logged and kept in warm_up_failures. Returns the errors of the
+        failed devices keyed by device id.
+        """
+        self._warm_up_failures = await warm_up_devices(
+            [device for devices in self.devices.values() for device in devices],
+            limit=limit,
+        )
+        for device_id, error in self._warm_up_failures.items():
+            _LOGGER.warning("Failed to warm up device %s: %s", device_id, error)
+        return self.warm_up_failures
+
+    def get(self, device_id: Any) -> Device:
+        """Return device by id.
+
+        Raises KeyError if the device is not registered.
+        """
+        for devices in self._devices.values():
+            if device_id in devices:
+                return devices[device_id]
+        raise KeyError(device_id)
+
+    def add_listener(
+        self, listener: Callable[[str, Device], None]
+    ) -> Callable[[], None]:
+        """Register a listener called with (event, device) on device lifecycle events.
+
+        Returns a callable removing the listener.
+        """
+        self._listeners.append(listener)
+
+        def remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove
+
+    def _emit(self, event: str, devices: List[Device]) -> None:
+        for device in devices:
+            for listener in list(self._listeners):
+                listener(event, device)
+
+    def _add(self, key: str, conf: Dict[str, Any]) -> Device:
+        device = DEVICE_CLASSES[key](
+            conf,
+            self._client,
+            set_debounce=self._device_set_debounce,
+            full_state_writes=self._full_state_writes,
+            conf_state_polling=self._conf_state_polling,
+            failure_threshold=self._failure_threshold,
+            freshness=self._freshness,
+            clock=self._client.clock,
+        )
+        self._devices[key][conf.get("DeviceID")] = device
+        return device
+
+    def _pop(self, device_id: Any) -> Optional[Device]:
+        for devices in self._devices.values():
+            if device_id in devices:
+                return devices.pop(device_id)
+        return None
+
+    def sync(self) -> RegistryChanges:
+        """Sync the registry with the device confs of the client.
+
+        Only the device ids differing from the previous sync are visited.
+        """
+        previous = self._confs
+        confs = list(self._client.device_confs)
+        diff = diff_confs(previous, confs)
+        self._confs = confs
+        changes = RegistryChanges([], [], [])
+        if not diff:
+            return changes
+
+        for conf in previous:
+            device_id = conf.get("DeviceID")
+            if device_id not in diff.removed:
+                continue
+            device = self._pop(device_id)
+            self._unknown.pop(device_id, None)
+            if device is not None:
+                changes.removed.append(device)
+
+        groups = classify_confs(
+            conf for conf in confs if conf.get("DeviceID") in diff.added
+        )
+        for conf in groups.pop(DEVICE_TYPE_UNKNOWN):
+            device_id = conf.get("DeviceID")
+            self._unknown[device_id] = conf.get("Device", {}).get("DeviceType")
+            _LOGGER.warning(
+                "Unsupported type %s of device %s", self._unknown[device_id], device_id
+            )
+        for key, added_confs in groups.items():
+            changes.added.extend(self._add(key, conf) for conf in added_confs)
+
+        for conf in confs:
+            device_id = conf.get("DeviceID")
+            if device_id in diff.changed and device_id not in self._unknown:
+                changes.changed.append(self.get(device_id))
+
+        self._emit(EVENT_DEVICE_REMOVED, changes.removed)
+        self._emit(EVENT_DEVICE_ADDED, changes.added)
+        self._emit(EVENT_DEVICE_CHANGED, changes.changed)
+        return changes
+
+    async def update(self) -> RegistryChanges:
+        """Update the device confs of the client and sync the registry."""
+        await self._client.update_confs()
+        return self.sync()
+
+
+async def warm_up_devices(
+    devices: Iterable[Device], *, limit: int = 8
+) -> Dict[Any, BaseException]:
+    """Fetch the state, energy report and units of devices concurrently.
+
+    At most limit devices are warmed up at a time. A failing device does not stop
+    the others.
+
+    Returns the errors of the failed devices keyed by device id.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _warm_up(device: Device) -> None:
+        async with semaphore:
+            await asyncio.gather(device.update(), device.load_units())
+
+    devices = list(devices)
+    results = await asyncio.gather(
+        *(_warm_up(device) for device in devices), return_exceptions=True
+    )
+    return {
+        device.device_id: result
+        for device, result in zip(devices, results)
+        if isinstance(result, BaseException)
+    }
@@ -0,0 +1,112 @@
+"""Prioritized request scheduling."""
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pymelcloud.clock import Clock, MonotonicClock
+
+PRIORITY_INTERACTIVE_WRITE = 0
+PRIORITY_INTERACTIVE_READ = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_BULK = 3
+
+# Priority, enqueue time, arrival sequence and the future resolved with a slot.
+_Waiter = Tuple[int, float, int, "asyncio.Future[None]"]
+
+
+class RequestScheduler:
+    """Limit concurrent requests and hand out free slots by priority.
+
+    Lower priority values are served first. Waiting requests age: every aging
+    interval spent waiting raises a request by one priority class, so background
+    requests are delayed, but not starved, by a stream of interactive ones.
+    Requests of equal effective priority are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        *,
+        aging: timedelta = timedelta(seconds=10),
+        clock: Optional[Clock] = None,
+    ):
+        """Initialize a scheduler.
+
+        Keyword arguments:
+            max_concurrent -- maximum number of concurrent requests.
+            (default = unlimited)
+            aging -- waiting time promoting a request by one priority class.
+            (default = 10 s)
+            clock -- clock measuring waiting time. (default = monotonic)
+        """
+        if max_concurrent is not None and max_concurrent < 1:
+            raise ValueError(f"Invalid concurrency limit [{max_concurrent}]")
+        self._max_concurrent = max_concurrent
+        self._aging = aging.total_seconds()
+        self._clock: Clock = MonotonicClock() if clock is None else clock
+        self._active = 0
+        self._sequence = itertools.count()
+        self._waiters: List[_Waiter] = []
+
+    @property
+    def active(self) -> int:
+        """Return number of requests holding a slot."""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """Return number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> Tuple[float, int]:
+        priority, enqueued, sequence, _ = waiter
+        return priority - (now - enqueued) / self._aging, sequence
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND) -> None:
+        """Wait for a request slot."""
+        if self._max_concurrent is None or (
+            self._active < self._max_concurrent and not self._waiters
+        ):
+            self._active += 1
+            return
+
+        waiter = (
+            priority,
+            self._clock.monotonic(),
+            next(self._sequence),
+            asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        try:
+            await waiter[3]
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif not waiter[3].cancelled():
+                # The slot was handed over just before the cancellation.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Release a request slot to the next waiting request."""
+        while self._waiters:
+            now = self._clock.monotonic()
+            waiter = min(
+                self._waiters, key=lambda waiter: self._effective_priority(waiter, now)
+            )
+            self._waiters.remove(waiter)
+            if not waiter[3].done():
+                waiter[3].set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_BACKGROUND) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the context."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
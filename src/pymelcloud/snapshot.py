@@ -0,0 +1,113 @@
+"""Columnar fleet snapshots."""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymelcloud.const import DEVICE_TYPE_LOOKUP, DEVICE_TYPE_UNKNOWN
+from pymelcloud.device import Device
+
+BACKEND_LIST = "list"
+BACKEND_NUMPY = "numpy"
+
+FIELD_DEVICE_ID = "device_id"
+FIELD_DEVICE_TYPE = "device_type"
+FIELD_ROOM_TEMPERATURE = "room_temperature"
+FIELD_TARGET_TEMPERATURE = "target_temperature"
+FIELD_POWER = "power"
+FIELD_OPERATION_MODE = "operation_mode"
+FIELD_WIFI_SIGNAL = "wifi_signal"
+FIELD_TOTAL_ENERGY_CONSUMED = "total_energy_consumed"
+FIELD_DAILY_ENERGY_CONSUMED = "daily_energy_consumed"
+
+SNAPSHOT_FIELDS = (
+    FIELD_DEVICE_ID,
+    FIELD_DEVICE_TYPE,
+    FIELD_ROOM_TEMPERATURE,
+    FIELD_TARGET_TEMPERATURE,
+    FIELD_POWER,
+    FIELD_OPERATION_MODE,
+    FIELD_WIFI_SIGNAL,
+    FIELD_TOTAL_ENERGY_CONSUMED,
+    FIELD_DAILY_ENERGY_CONSUMED,
+)
+
+# State keys for room temperature, target temperature and operation mode code keyed
+# by DeviceType. Air-to-water devices report the values of the first zone.
+_STATE_KEYS: Dict[int, Tuple[str, Optional[str], str]] = {
+    0: ("RoomTemperature", "SetTemperature", "OperationMode"),
+    1: ("RoomTemperatureZone1", "SetTemperatureZone1", "OperationMode"),
+    3: ("RoomTemperature", None, "VentilationMode"),
+}
+
+def fleet_snapshot(
+    devices: Iterable[Device], *, backend: str = BACKEND_LIST
+) -> Dict[str, Any]:
+    """Export the cached state of devices as columns.
+
+    The snapshot is built in a single pass over the raw device confs, states and
+    cached energy values without going through the device properties. Each field in
+    SNAPSHOT_FIELDS maps to a column with one value per device. Missing values are
+    None with the list backend.
+
+    The numpy backend returns float64 arrays with NaN for missing values, an int64
+    device_id column and a str device_type column. It requires numpy to be
+    installed.
+
+    Both backends can be passed as is to pyarrow.table().
+    """
+    if backend not in (BACKEND_LIST, BACKEND_NUMPY):
+        raise ValueError(f"Unsupported snapshot backend [{backend}]")
+
+    columns: Dict[str, List[Any]] = {field: [] for field in SNAPSHOT_FIELDS}
+    device_ids = columns[FIELD_DEVICE_ID]
+    device_types = columns[FIELD_DEVICE_TYPE]
+    room_temperatures = columns[FIELD_ROOM_TEMPERATURE]
+    target_temperatures = columns[FIELD_TARGET_TEMPERATURE]
+    powers = columns[FIELD_POWER]
+    operation_modes = columns[FIELD_OPERATION_MODE]
+    wifi_signals = columns[FIELD_WIFI_SIGNAL]
+    total_energies = columns[FIELD_TOTAL_ENERGY_CONSUMED]
+    daily_energies = columns[FIELD_DAILY_ENERGY_CONSUMED]
+
+    for device in devices:
+        conf_device = device._device_conf.get("Device", {})
+        state: Dict[str, Any] = device._state or {}
+        device_type = conf_device.get("DeviceType", -1)
+        room_key, target_key, mode_key = _STATE_KEYS.get(
+            device_type, ("RoomTemperature", None, "")
+        )
+
+        device_ids.append(device.device_id)
+        device_types.append(DEVICE_TYPE_LOOKUP.get(device_type, DEVICE_TYPE_UNKNOWN))
+        room_temperatures.append(state.get(room_key))
+        target_temperatures.append(
+            state.get(target_key) if target_key is not None else None
+        )
+        powers.append(state.get("Power"))
+        operation_modes.append(state.get(mode_key))
+        wifi_signals.append(conf_device.get("WifiSignalStrength"))
+
+        total_energies.append(device._energy_meter.total)
+        daily_energies.append(device._daily_energy_consumed)
+
+    if backend == BACKEND_NUMPY:
+        return _to_numpy(columns)
+    return columns
+
+
+def _to_numpy(columns: Dict[str, List[Any]]) -> Dict[str, Any]:
+    try:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+    except ImportError as ex:
+        raise ImportError("The numpy snapshot backend requires numpy") from ex
+
+    arrays: Dict[str, Any] = {}
+    for field, values in columns.items():
+        if field == FIELD_DEVICE_ID:
+            arrays[field] = np.array(values, dtype=np.int64)
+        elif field == FIELD_DEVICE_TYPE:
+            arrays[field] = np.array(values, dtype=str)
+        else:
+            arrays[field] = np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+    return arrays
@@ -0,0 +1,40 @@
+"""Persistent storage helpers."""
+import json
+import os
+from typing import Any, Dict
+
+
+class JsonStore:
+    """Dictionary persisted as a JSON file.
+
+    Writes go through a temporary file that is atomically moved in place to avoid
+    truncated files on crashes.
+    """
+
+    def __init__(self, path: str):
+        """Initialize a store backed by the file at path."""
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        """Return path of the backing file."""
+        return self._path
+
+    def load(self) -> Dict[str, Any]:
+        """Return the stored data or an empty dict if nothing has been saved."""
+        try:
+            with open(self._path, "r", encoding="utf-8") as file:
+                data: Dict[str, Any] = json.load(file)
+                return data
+        except FileNotFoundError:
+            return {}
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """Replace the stored data."""
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, self._path)
@@ -66,13 +66,13 @@ async def test_ata():
     assert device.has_energy_consumed_meter is False
     assert device.room_temperature is None
 
-    assert device.operation_modes == [
+    assert device.operation_modes == (
         OPERATION_MODE_HEAT,
         OPERATION_MODE_DRY,
         OPERATION_MODE_COOL,
         OPERATION_MODE_FAN_ONLY,
         OPERATION_MODE_HEAT_COOL,
-    ]
+    )
     assert device.fan_speed is None
     assert device.fan_speeds is None
 
@@ -84,7 +84,7 @@ async def test_ata():
     assert device.operation_mode == OPERATION_MODE_COOL
     assert device.fan_speed == "3"
     assert device.actual_fan_speed == "0"
-    assert device.fan_speeds == ["auto", "1", "2", "3", "4", "5"]
+    assert device.fan_speeds == ("auto", "1", "2", "3", "4", "5")
 
     assert device.vane_vertical == V_VANE_POSITION_AUTO
     assert device.vane_horizontal == H_VANE_POSITION_3
@@ -101,3 +101,35 @@ async def test_ata_guest():
     assert device.device_type == DEVICE_TYPE_ATA
     assert device.access_level == ACCESS_LEVEL["GUEST"]
     await device.update()
+
+
+@pytest.mark.asyncio
+async def test_ata_capability_profile_shared():
+    device = _build_device("ata_listdevice.json", "ata_get.json")
+    other = _build_device("ata_listdevice.json", "ata_get.json")
+
+    assert device._capability_profile() is other._capability_profile()
+    assert device.vane_horizontal_positions == (
+        H_VANE_POSITION_AUTO,
+        H_VANE_POSITION_1,
+        H_VANE_POSITION_2,
+        H_VANE_POSITION_3,
+        H_VANE_POSITION_4,
+        H_VANE_POSITION_5,
+        H_VANE_POSITION_SPLIT,
+        H_VANE_POSITION_SWING,
+    )
+    assert device.vane_vertical_positions == (
+        V_VANE_POSITION_AUTO,
+        V_VANE_POSITION_1,
+        V_VANE_POSITION_2,
+        V_VANE_POSITION_3,
+        V_VANE_POSITION_4,
+        V_VANE_POSITION_5,
+        V_VANE_POSITION_SWING,
+    )
+
+    device._device_conf = {**device._device_conf, "HideVaneControls": True}
+
+    assert device.vane_horizontal_positions == ()
+    assert device.vane_vertical_positions == ()
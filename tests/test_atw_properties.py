@@ -36,10 +36,10 @@ async def test_1zone():
     assert device.temperature_increment == 0.5
 
     assert device.operation_mode is None
-    assert device.operation_modes == [
+    assert device.operation_modes == (
         OPERATION_MODE_AUTO,
         OPERATION_MODE_FORCE_HOT_WATER,
-    ]
+    )
     assert device.tank_temperature is None
     assert device.status is STATUS_UNKNOWN
     assert device.target_tank_temperature is None
@@ -64,11 +64,11 @@ async def test_1zone():
     assert zones[0].return_temperature == 53.0
     assert zones[0].target_flow_temperature is None
     assert zones[0].operation_mode is None
-    assert zones[0].operation_modes == [
+    assert zones[0].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
-    ]
+    )
     assert zones[0].status == ZONE_STATUS_UNKNOWN
 
     await device.update()
@@ -89,11 +89,11 @@ async def test_1zone():
     assert zones[0].target_temperature == 30
     assert zones[0].target_flow_temperature == 60.0
     assert zones[0].operation_mode == ZONE_OPERATION_MODE_HEAT_FLOW
-    assert zones[0].operation_modes == [
+    assert zones[0].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
-    ]
+    )
     assert zones[0].status == ZONE_STATUS_HEAT
 
 
@@ -106,10 +106,10 @@ async def test_2zone():
     assert device.temperature_increment == 0.5
 
     assert device.operation_mode is None
-    assert device.operation_modes == [
+    assert device.operation_modes == (
         OPERATION_MODE_AUTO,
         OPERATION_MODE_FORCE_HOT_WATER,
-    ]
+    )
     assert device.tank_temperature is None
     assert device.status is STATUS_UNKNOWN
     assert device.target_tank_temperature is None
@@ -134,11 +134,11 @@ async def test_2zone():
     assert zones[0].return_temperature == 30.0
     assert zones[0].target_flow_temperature is None
     assert zones[0].operation_mode is None
-    assert zones[0].operation_modes == [
+    assert zones[0].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
-    ]
+    )
     assert zones[0].status == ZONE_STATUS_UNKNOWN
 
     assert zones[1].name == "Upstairs"
@@ -149,11 +149,11 @@ async def test_2zone():
     assert zones[1].return_temperature == 30.0
     assert zones[1].target_flow_temperature is None
     assert zones[1].operation_mode is None
-    assert zones[1].operation_modes == [
+    assert zones[1].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
-    ]
+    )
     assert zones[1].status == ZONE_STATUS_UNKNOWN
 
     await device.update()
@@ -174,22 +174,22 @@ async def test_2zone():
     assert zones[0].target_temperature == 19.5
     assert zones[0].target_flow_temperature == 25.0
     assert zones[0].operation_mode == ZONE_OPERATION_MODE_HEAT_THERMOSTAT
-    assert zones[0].operation_modes == [
+    assert zones[0].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
-    ]
+    )
     assert zones[0].status == ZONE_STATUS_HEAT
 
     assert zones[1].room_temperature == 19.5
     assert zones[1].target_temperature == 18
     assert zones[1].target_flow_temperature == 25.0
     assert zones[1].operation_mode == ZONE_OPERATION_MODE_HEAT_THERMOSTAT
-    assert zones[1].operation_modes == [
+    assert zones[1].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
-    ]
+    )
     assert zones[1].status == ZONE_STATUS_HEAT
 
 
@@ -204,10 +204,10 @@ async def test_2zone_cancool():
     assert device.temperature_increment == 0.5
 
     assert device.operation_mode is None
-    assert device.operation_modes == [
+    assert device.operation_modes == (
         OPERATION_MODE_AUTO,
         OPERATION_MODE_FORCE_HOT_WATER,
-    ]
+    )
     assert device.tank_temperature is None
     assert device.status is STATUS_UNKNOWN
     assert device.target_tank_temperature is None
@@ -232,13 +232,13 @@ async def test_2zone_cancool():
     assert zones[0].return_temperature == 50.5
     assert zones[0].target_flow_temperature is None
     assert zones[0].operation_mode is None
-    assert zones[0].operation_modes == [
+    assert zones[0].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
         ZONE_OPERATION_MODE_COOL_THERMOSTAT,
         ZONE_OPERATION_MODE_COOL_FLOW,
-    ]
+    )
     assert zones[0].status == ZONE_STATUS_UNKNOWN
 
     assert zones[1].name == "Zone 2"
@@ -249,13 +249,13 @@ async def test_2zone_cancool():
     assert zones[1].return_temperature == 50.5
     assert zones[1].target_flow_temperature is None
     assert zones[1].operation_mode is None
-    assert zones[1].operation_modes == [
+    assert zones[1].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
         ZONE_OPERATION_MODE_COOL_THERMOSTAT,
         ZONE_OPERATION_MODE_COOL_FLOW,
-    ]
+    )
     assert zones[1].status == ZONE_STATUS_UNKNOWN
 
     await device.update()
@@ -276,24 +276,24 @@ async def test_2zone_cancool():
     assert zones[0].target_temperature == 20.5
     assert zones[0].target_flow_temperature == 5.0
     assert zones[0].operation_mode == ZONE_OPERATION_MODE_CURVE
-    assert zones[0].operation_modes == [
+    assert zones[0].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
         ZONE_OPERATION_MODE_COOL_THERMOSTAT,
         ZONE_OPERATION_MODE_COOL_FLOW,
-    ]
+    )
     assert zones[0].status == ZONE_STATUS_IDLE
 
     assert zones[1].room_temperature == 21.0
     assert zones[1].target_temperature == 21.0
     assert zones[1].target_flow_temperature == 5.0
     assert zones[1].operation_mode == ZONE_OPERATION_MODE_CURVE
-    assert zones[1].operation_modes == [
+    assert zones[1].operation_modes == (
         ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
         ZONE_OPERATION_MODE_HEAT_FLOW,
         ZONE_OPERATION_MODE_CURVE,
         ZONE_OPERATION_MODE_COOL_THERMOSTAT,
         ZONE_OPERATION_MODE_COOL_FLOW,
-    ]
+    )
     assert zones[1].status == ZONE_STATUS_IDLE
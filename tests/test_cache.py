@@ -0,0 +1,37 @@
+"""Cache tests."""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.pymelcloud.cache import UnitsCache
+from src.pymelcloud.clock import VirtualClock
+
+
+@pytest.mark.asyncio
+async def test_units_cache_persisted(tmp_path):
+    path = tmp_path / "units.json"
+    clock = VirtualClock()
+    cache = UnitsCache(str(path), flush_interval=timedelta(seconds=10), clock=clock)
+    cache.set(1, [{"Model": "MSZ"}])
+    cache.set(2, [{"Model": "PUHZ"}])
+    await clock.advance(9)
+    assert not path.exists()
+
+    await clock.advance(1)
+    # Waits for the write started by the timer, which runs in an executor.
+    await cache.flush()
+
+    assert UnitsCache(str(path)).get(1) == [{"Model": "MSZ"}]
+    assert UnitsCache(str(path)).get(2) == [{"Model": "PUHZ"}]
+    assert UnitsCache(str(path)).get(3) is None
+
+
+def test_units_cache_expires():
+    cache = UnitsCache(ttl=timedelta(hours=1))
+    with patch("src.pymelcloud.cache.time.time", return_value=1000.0):
+        cache.set(1, [])
+    with patch("src.pymelcloud.cache.time.time", return_value=1000.0 + 3599):
+        assert cache.get(1) == []
+    with patch("src.pymelcloud.cache.time.time", return_value=1000.0 + 3601):
+        assert cache.get(1) is None
@@ -0,0 +1,117 @@
+"""Cassette tests."""
+import asyncio
+import gzip
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.pymelcloud.cassette import CassettePlayer, CassetteRecorder, load_cassette
+from src.pymelcloud.client import Client
+from src.pymelcloud.clock import VirtualClock
+
+_LIST_DEVICES = [
+    {
+        "ID": 1,
+        "Structure": {
+            "Devices": [
+                {
+                    "DeviceID": 1,
+                    "BuildingID": 1,
+                    "DeviceName": "Anna's room",
+                    "OwnerEmail": "owner@example.com",
+                    "OwnerName": "Anna Owner",
+                    "MacAddress": "aa:bb:cc:dd:ee:ff",
+                    "SerialNumber": "1234567890",
+                    "Device": {},
+                }
+            ],
+            "Areas": [],
+            "Floors": [],
+        },
+    }
+]
+_USER = {"EmailAddress": "my@example.com", "ContextKey": "secret"}
+
+
+def _session(*responses) -> MagicMock:
+    session = MagicMock()
+    session.request.return_value.__aenter__.return_value.read = AsyncMock(
+        side_effect=[json.dumps(response).encode() for response in responses]
+    )
+    return session
+
+
+async def _record(path) -> CassetteRecorder:
+    recorder = CassetteRecorder(str(path))
+    client = Client(
+        "token", _session(_LIST_DEVICES, _USER, {"Power": True}), transport=recorder
+    )
+    await client.update_confs()
+    await client.set_device_state({"DeviceType": 0, "Power": True})
+    recorder.save()
+    return recorder
+
+
+@pytest.mark.asyncio
+async def test_record_scrubs_credentials(tmp_path):
+    path = tmp_path / "session.cassette"
+    recorder = await _record(path)
+
+    assert len(recorder) == 3
+    with gzip.open(path, "rt") as file:
+        content = file.read()
+    assert "token" not in content
+    assert "secret" not in content
+    for value in (
+        "my@example.com",
+        "owner@example.com",
+        "Anna",
+        "aa:bb:cc:dd:ee:ff",
+        "1234567890",
+    ):
+        assert value not in content
+
+    interactions = load_cassette(str(path))
+    assert [(i["method"], i["path"]) for i in interactions] == [
+        ("GET", "User/ListDevices"),
+        ("GET", "User/GetUserDetails"),
+        ("POST", "Device/SetAta"),
+    ]
+    assert json.loads(interactions[2]["request"]) == {"DeviceType": 0, "Power": True}
+
+
+@pytest.mark.asyncio
+async def test_replay(tmp_path):
+    path = tmp_path / "session.cassette"
+    await _record(path)
+    interactions = load_cassette(str(path))
+    for interaction in interactions:
+        interaction["elapsed"] = 0.0
+    interactions[2]["elapsed"] = 2.0
+    with gzip.open(path, "wt") as file:
+        file.write(json.dumps({"version": 1}) + "\n")
+        for interaction in interactions:
+            file.write(json.dumps(interaction) + "\n")
+
+    clock = VirtualClock()
+    player = CassettePlayer(str(path), speed=2.0, clock=clock)
+    session = MagicMock()
+    client = Client("token", session, transport=player)
+
+    await client.update_confs()
+    assert [conf["DeviceID"] for conf in client.device_confs] == [1]
+    assert client.account["ContextKey"] == "***"
+
+    write = asyncio.ensure_future(
+        client.set_device_state({"DeviceType": 0, "Power": True})
+    )
+    await clock.advance(0.5)
+    assert not write.done()
+    await clock.advance(0.5)
+    assert await write == {"Power": True}
+
+    session.request.assert_not_called()
+    assert player.remaining() == 0
+    with pytest.raises(ValueError):
+        await client.set_device_state({"DeviceType": 0})
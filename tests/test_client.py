@@ -0,0 +1,255 @@
+"""Client tests."""
+import asyncio
+import json
+from datetime import timedelta
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.pymelcloud.client import BASE_URL, Client, ConfDiff, DeviceLocation
+from src.pymelcloud.clock import VirtualClock
+from src.pymelcloud.codec import StdlibJsonCodec, default_codec
+
+
+def _session(*responses) -> MagicMock:
+    session = MagicMock()
+    session.request.return_value.__aenter__.return_value.read = AsyncMock(
+        side_effect=[json.dumps(response).encode() for response in responses]
+    )
+    return session
+
+
+def _conf(device_id: int, building_id: int = 1):
+    return {"DeviceID": device_id, "BuildingID": building_id, "Device": {}}
+
+
+_LIST_DEVICES = [
+    {
+        "ID": 1,
+        "Structure": {
+            "Devices": [_conf(1)],
+            "Areas": [{"ID": 10, "Devices": [_conf(2)]}],
+            "Floors": [
+                {
+                    "ID": 20,
+                    "Devices": [_conf(3), _conf(1)],
+                    "Areas": [{"ID": 21, "Devices": [_conf(4)]}],
+                }
+            ],
+        },
+    }
+]
+
+
+@pytest.mark.asyncio
+async def test_fetch_device_confs_keeps_structure():
+    client = Client("token", _session(_LIST_DEVICES, {}))
+
+    await client.update_confs()
+
+    assert [conf["DeviceID"] for conf in client.device_confs] == [1, 2, 3, 4]
+    assert client.device_locations == {
+        1: DeviceLocation(1, None, None),
+        2: DeviceLocation(1, None, 10),
+        3: DeviceLocation(1, 20, None),
+        4: DeviceLocation(1, 20, 21),
+    }
+
+
+@pytest.mark.asyncio
+async def test_update_confs_diff():
+    devices = [
+        {**_conf(1), "Device": {"RoomTemperature": 21.5}},
+        _conf(5),
+        {**_conf(2), "Device": {"CanCool": True}},
+    ]
+    changed = [{"ID": 1, "Structure": {"Devices": devices, "Areas": [], "Floors": []}}]
+    client = Client(
+        "token",
+        _session(_LIST_DEVICES, {}, changed),
+        conf_update_interval=timedelta(0),
+    )
+
+    diff = await client.update_confs()
+    assert diff == ConfDiff(added=frozenset({1, 2, 3, 4}))
+
+    diff = await client.update_confs()
+    assert diff == ConfDiff(
+        added=frozenset({5}), removed=frozenset({3, 4}), changed=frozenset({2})
+    )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_responses_are_not_decoded():
+    codec = StdlibJsonCodec()
+    codec.loads = MagicMock(side_effect=codec.loads)
+    device = MagicMock(device_id=1, building_id=1)
+    client = Client(
+        "token",
+        _session(_LIST_DEVICES, {}, _LIST_DEVICES, {"Power": True}, {"Power": True}),
+        conf_update_interval=timedelta(0),
+        codec=codec,
+    )
+
+    await client.update_confs()
+    confs = client.device_confs
+    assert await client.update_confs() == ConfDiff()
+    assert client.device_confs is confs
+
+    state = await client.fetch_device_state(device)
+    assert await client.fetch_device_state(device) is state
+    assert codec.loads.call_count == 3
+
+
+class _FakeDevice:
+    def __init__(self, delay: float, state, error: Optional[Exception] = None):
+        self._delay = delay
+        self._next_state = state
+        self._error = error
+        self._state = {"Power": False}
+        self.stale = False
+
+    def mark_stale(self):
+        self.stale = True
+
+    async def update(self):
+        await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+        self._state = self._next_state
+
+
+@pytest.mark.asyncio
+async def test_poll_yields_in_completion_order():
+    client = Client("token", _session(_LIST_DEVICES, {}))
+    slow = _FakeDevice(0.02, {"Power": True})
+    fast = _FakeDevice(0.0, {"Power": False, "RoomTemperature": 21.0})
+
+    results = [result async for result in client.poll([slow, fast])]
+
+    assert results == [
+        (fast, frozenset({"RoomTemperature"})),
+        (slow, frozenset({"Power"})),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_poll_failures():
+    error = ValueError("offline")
+    devices = [_FakeDevice(0.0, {}, error), _FakeDevice(0.01, {"Power": False})]
+
+    client = Client("token", _session(_LIST_DEVICES, {}))
+    results = [
+        result async for result in client.poll(devices, return_exceptions=True)
+    ]
+    assert results == [(devices[0], error), (devices[1], frozenset())]
+
+    client = Client("token", _session(_LIST_DEVICES, {}))
+    with pytest.raises(ValueError):
+        async for _ in client.poll(devices):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_poll_deadline():
+    client = Client("token", _session(_LIST_DEVICES, {}))
+    slow = _FakeDevice(1.0, {"Power": True})
+    fast = _FakeDevice(0.0, {"Power": True})
+
+    results = [
+        result
+        async for result in client.poll(
+            [slow, fast], deadline=timedelta(milliseconds=50)
+        )
+    ]
+
+    assert results == [(fast, frozenset({"Power"}))]
+    assert slow.stale and not fast.stale
+    assert slow._state == {"Power": False}
+
+
+@pytest.mark.asyncio
+async def test_poll_request_timeout_marks_stale():
+    client = Client("token", _session(_LIST_DEVICES, {}))
+    timed_out = _FakeDevice(0.0, {"Power": True}, asyncio.TimeoutError())
+    other = _FakeDevice(0.01, {"Power": True})
+
+    results = [result async for result in client.poll([timed_out, other])]
+
+    assert results == [(other, frozenset({"Power"}))]
+    assert timed_out.stale and not other.stale
+
+
+@pytest.mark.asyncio
+async def test_request_timeouts():
+    session = _session({}, {})
+    client = Client(
+        "token",
+        session,
+        request_timeout=timedelta(seconds=10),
+        endpoint_timeouts={"Device/Get": timedelta(seconds=5)},
+    )
+
+    await client.fetch_device_state(MagicMock(device_id=1, building_id=2))
+    assert session.request.call_args[1]["timeout"].total == 5
+    await client.set_device_state({"DeviceType": 0})
+    assert session.request.call_args[1]["timeout"].total == 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", [StdlibJsonCodec(), default_codec()])
+async def test_set_device_state_uses_codec(codec):
+    session = _session({"Power": True})
+    client = Client("token", session, codec=codec)
+
+    state = await client.set_device_state({"DeviceType": 0, "Power": True})
+
+    assert state == {"Power": True}
+    args, kwargs = session.request.call_args
+    assert args == ("POST", f"{BASE_URL}/Device/SetAta")
+    assert json.loads(kwargs["data"]) == {"DeviceType": 0, "Power": True}
+
+
+@pytest.mark.asyncio
+async def test_set_device_state_invalid_type():
+    client = Client("token", _session())
+
+    with pytest.raises(ValueError):
+        await client.set_device_state({"DeviceType": 2})
+
+
+@pytest.mark.asyncio
+async def test_fetch_device_units_cached():
+    session = _session([{"Model": "MSZ"}])
+    client = Client("token", session)
+    device = MagicMock(device_id=1)
+
+    assert client.cached_device_units(1) is None
+    assert await client.fetch_device_units(device) == [{"Model": "MSZ"}]
+    assert await client.fetch_device_units(device) == [{"Model": "MSZ"}]
+    assert client.cached_device_units(1) == [{"Model": "MSZ"}]
+    assert session.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_update_confs_interval_uses_clock():
+    clock = VirtualClock()
+    session = _session(_LIST_DEVICES, {}, _LIST_DEVICES)
+    client = Client(
+        "token",
+        session,
+        user_update_interval=timedelta(hours=1),
+        conf_update_interval=timedelta(minutes=5),
+        clock=clock,
+    )
+
+    await client.update_confs()
+    await clock.advance(300)
+    await client.update_confs()
+    assert session.request.call_count == 2
+    assert client.conf_generation == 1
+    await clock.advance(1)
+    await client.update_confs()
+    assert session.request.call_count == 3
+    assert client.conf_generation == 2
@@ -0,0 +1,67 @@
+"""Clock tests."""
+import asyncio
+
+import pytest
+
+from src.pymelcloud.clock import VirtualClock
+
+
+@pytest.mark.asyncio
+async def test_advance_runs_periodic_task_deterministically():
+    clock = VirtualClock()
+    ticks = []
+
+    async def _periodic():
+        while True:
+            await clock.sleep(5)
+            # More event loop turns between sleeps than advance could guess.
+            for _ in range(50):
+                await asyncio.sleep(0)
+            ticks.append(clock.monotonic())
+
+    task = asyncio.ensure_future(_periodic())
+    await clock.advance(100)
+
+    assert ticks == [5.0 * i for i in range(1, 21)]
+    assert clock.monotonic() == 100
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_advance_wakes_sleepers_in_deadline_order():
+    clock = VirtualClock()
+    woken = []
+
+    async def _sleep(seconds):
+        await clock.sleep(seconds)
+        woken.append(seconds)
+
+    tasks = [asyncio.ensure_future(_sleep(seconds)) for seconds in (3, 1, 2, 10)]
+    await clock.advance(5)
+
+    assert woken == [1, 2, 3]
+    assert not tasks[3].done()
+    await clock.advance(5)
+    assert woken == [1, 2, 3, 10]
+
+
+@pytest.mark.asyncio
+async def test_advance_runs_children_sleeping_on_the_clock():
+    clock = VirtualClock()
+    polls = []
+
+    async def _request(seconds):
+        await clock.sleep(seconds)
+        return clock.monotonic()
+
+    async def _poll():
+        while True:
+            await clock.sleep(60)
+            polls.append(await asyncio.gather(_request(1), _request(2)))
+
+    task = asyncio.ensure_future(_poll())
+    await asyncio.wait_for(clock.advance(125), timeout=5)
+
+    assert polls == [[61.0, 62.0], [123.0, 124.0]]
+    assert clock.monotonic() == 125
+    task.cancel()
@@ -1,9 +1,15 @@
 """Device tests."""
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
 from src.pymelcloud.ata_device import AtaDevice
+from src.pymelcloud.atw_device import AtwDevice
+from src.pymelcloud.device import _parse_timestamp
+from src.pymelcloud.clock import VirtualClock
+from src.pymelcloud.health import FreshnessPolicy
 from .util import build_device
 
 import src.pymelcloud  
@@ -71,3 +77,316 @@ async def test_round_temperature():
     await device.update()
 
     assert device.daily_energy_consumed == 1111.0
+
+
+@pytest.mark.asyncio
+async def test_state_fetch_skipped_without_new_communication():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.device_confs = [device_conf]
+    device = AtaDevice(device_conf, client)
+
+    await device.update()
+    client.conf_generation = 2
+    await device.update()
+
+    assert client.fetch_device_state.call_count == 1
+    assert device.skipped_state_fetches == 1
+
+    device_conf["Device"]["LastTimeStamp"] = "2020-06-27T20:58:00"
+    client.conf_generation = 3
+    await device.update()
+
+    assert client.fetch_device_state.call_count == 2
+    assert device.skipped_state_fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_state_fetched_without_conf_refresh():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.device_confs = [device_conf]
+    device = AtaDevice(device_conf, client)
+
+    await device.update()
+    await device.update()
+
+    assert client.fetch_device_state.call_count == 2
+    assert device.skipped_state_fetches == 0
+
+    client.conf_generation = 2
+    await device.update()
+    await device.update()
+
+    assert client.fetch_device_state.call_count == 3
+    assert device.skipped_state_fetches == 1
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("2020-07-03T09:03:50.32", datetime(2020, 7, 3, 9, 3, 50, 320000)),
+        ("2020-07-07T06:44:11.027", datetime(2020, 7, 7, 6, 44, 11, 27000)),
+        ("2020-01-01T12:00:00.000", datetime(2020, 1, 1, 12)),
+        ("2020-01-01T12:00:00", datetime(2020, 1, 1, 12)),
+        ("2020-01-01T12:00:00.1234567", datetime(2020, 1, 1, 12, 0, 0, 123456)),
+    ],
+)
+def test_parse_timestamp(value, expected):
+    assert _parse_timestamp(value) == expected.replace(tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_last_seen():
+    device = _build_device("ata_listdevice.json", "ata_get.json")
+
+    assert device.last_seen is None
+
+    await device.update()
+
+    assert device.last_seen == datetime(2020, 7, 3, 9, 3, 50, 320000, timezone.utc)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("full_state_writes", [False, True])
+async def test_write_payload(full_state_writes):
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    device = AtaDevice(
+        device_conf,
+        client,
+        set_debounce=timedelta(0),
+        full_state_writes=full_state_writes,
+    )
+    await device.update()
+    client.set_device_state = AsyncMock(return_value={"SetTemperature": 23.0})
+
+    await device.set({"target_temperature": 23.0, "power": True})
+
+    payload = client.set_device_state.call_args[0][0]
+    assert payload["EffectiveFlags"] == 0x05
+    assert payload["HasPendingCommand"] is True
+    assert payload["SetTemperature"] == 23.0
+    assert payload["Power"] is True
+    if full_state_writes:
+        assert "RoomTemperature" in payload
+        assert device._state == {"SetTemperature": 23.0}
+    else:
+        assert set(payload) == {
+            "DeviceID",
+            "DeviceType",
+            "EffectiveFlags",
+            "HasPendingCommand",
+            "SetTemperature",
+            "Power",
+        }
+        assert device.target_temperature == 23.0
+        assert device.room_temperature is not None
+
+
+_FLOW = (
+    "SetHeatFlowTemperatureZone1",
+    "SetCoolFlowTemperatureZone1",
+    "SetHeatFlowTemperatureZone2",
+    "SetCoolFlowTemperatureZone2",
+)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "properties,fields",
+    [
+        # The tank flag covers the flow temperature bit.
+        ({"target_tank_temperature": 50}, {"SetTankWaterTemperature", *_FLOW}),
+        (
+            {"target_tank_temperature": 50, "zone_1_target_heat_flow_temperature": 35},
+            {"SetTankWaterTemperature", *_FLOW},
+        ),
+        ({"zone_1_target_heat_flow_temperature": 35}, set(_FLOW)),
+        ({"zone_2_target_temperature": 21}, {"SetTemperatureZone2"}),
+    ],
+)
+async def test_atw_write_payload(properties, fields):
+    device_conf, client = build_device("atw_2zone_listdevice.json", "atw_2zone_get.json")
+    device = AtwDevice(device_conf, client, set_debounce=timedelta(0))
+    await device.update()
+    client.set_device_state = AsyncMock(return_value={})
+
+    await device.set(properties)
+
+    payload = client.set_device_state.call_args[0][0]
+    assert set(payload) == {
+        "DeviceID",
+        "DeviceType",
+        "EffectiveFlags",
+        "HasPendingCommand",
+        *fields,
+    }
+    assert all(payload[key] is not None for key in fields)
+
+
+@pytest.mark.asyncio
+async def test_conf_state_polling():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.device_confs = [device_conf]
+    device = AtaDevice(
+        device_conf, client, set_debounce=timedelta(0), conf_state_polling=True
+    )
+
+    await device.update()
+    vane_horizontal = device.vane_horizontal
+    vane_vertical = device.vane_vertical
+    last_seen = device.last_seen
+    device_conf["Device"]["RoomTemperature"] = 30.0
+    device_conf["Device"]["FanSpeed"] = 1
+    await device.update()
+
+    client.fetch_device_state.assert_called_once()
+    assert device.room_temperature == 30.0
+    assert device.fan_speed == "1"
+    # Vane directions and the conf timestamp do not match the Device/Get fields.
+    assert device.vane_horizontal == vane_horizontal
+    assert device.vane_vertical == vane_vertical == "auto"
+    assert device.last_seen == last_seen
+    assert last_seen == datetime(2020, 7, 3, 9, 3, 50, 320000, tzinfo=timezone.utc)
+
+    client.set_device_state = AsyncMock(return_value={"SetTemperature": 23.0})
+    await device.set({"target_temperature": 23.0})
+
+    assert client.fetch_device_state.call_count == 2
+    assert device.room_temperature == 28.0
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_failures():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.device_confs = [device_conf]
+    state = client.fetch_device_state.return_value
+    client.fetch_device_state = AsyncMock(side_effect=TimeoutError)
+    device = AtaDevice(device_conf, client, failure_threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            await device.update()
+    assert device.health.circuit_open
+    assert device.health.consecutive_failures == 2
+
+    await device.update()
+    assert client.fetch_device_state.call_count == 2
+
+    device._circuit_breaker._next_probe = 0.0
+    client.fetch_device_state = AsyncMock(return_value=state)
+    await device.update()
+    assert not device.health.circuit_open
+    assert device.health.stale
+    assert not device.health.has_error
+
+    device._last_seen = datetime.now(timezone.utc)
+    assert not device.health.stale
+    device.mark_stale()
+    assert device.health.stale
+
+
+@pytest.mark.asyncio
+async def test_ensure_fresh():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.device_confs = [device_conf]
+    clock = VirtualClock(1000.0)
+    device = AtaDevice(
+        device_conf,
+        client,
+        freshness=FreshnessPolicy(timedelta(seconds=60), timedelta(seconds=600)),
+        clock=clock,
+    )
+    assert device.state_age is None
+
+    await device.ensure_fresh()
+    assert client.update_confs.call_count == 1
+    assert device.state_age == timedelta(0)
+
+    await clock.advance(30)
+    await device.ensure_fresh()
+    assert device._refresh_task is None
+
+    await clock.advance(70)
+    await device.ensure_fresh()
+    assert device.state_age == timedelta(seconds=100)
+    await device._refresh_task
+    assert client.update_confs.call_count == 2
+    assert device.state_age == timedelta(0)
+
+    await clock.advance(900)
+    await device.ensure_fresh()
+    assert client.update_confs.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_write_debounce_uses_clock():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    clock = VirtualClock()
+    device = AtaDevice(
+        device_conf, client, set_debounce=timedelta(hours=1), clock=clock
+    )
+    await device.update()
+    client.set_device_state = AsyncMock(return_value={})
+
+    write = asyncio.ensure_future(device.set({"power": True}))
+    await clock.advance(3599)
+    client.set_device_state.assert_not_called()
+    await clock.advance(1)
+    await write
+    client.set_device_state.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_update_keeps_state_on_energy_report_failure():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.fetch_energy_report = AsyncMock(side_effect=TimeoutError)
+    device = AtaDevice(device_conf, client)
+
+    await device.update()
+
+    assert device.room_temperature is not None
+    assert device.daily_energy_consumed is None
+
+
+@pytest.mark.asyncio
+async def test_update_raises_on_state_failure():
+    device_conf, client = build_device(
+        "ata_listdevice.json", "ata_get.json", {"Heating": [1.0]}
+    )
+    client.fetch_device_state = AsyncMock(side_effect=TimeoutError)
+    device = AtaDevice(device_conf, client)
+
+    with pytest.raises(TimeoutError):
+        await device.update()
+
+    assert device.room_temperature is None
+    assert device.daily_energy_consumed == 1.0
+
+
+@pytest.mark.asyncio
+async def test_units_loaded_lazily():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.fetch_device_units = AsyncMock(
+        return_value=[{"Model": "MSZ", "ModelNumber": 1, "SerialNumber": "123"}]
+    )
+    device = AtaDevice(device_conf, client)
+
+    await device.update()
+    client.fetch_device_units.assert_not_called()
+
+    assert device.units is None
+    await asyncio.sleep(0)
+
+    assert device.units == [
+        {"model_number": 1, "model": "MSZ", "serial_number": "123"}
+    ]
+    client.fetch_device_units.assert_called_once()
+
+
+def test_units_from_cache():
+    device_conf, client = build_device("ata_listdevice.json", "ata_get.json")
+    client.cached_device_units = Mock(return_value=[{"Model": "MSZ"}])
+    device = AtaDevice(device_conf, client)
+
+    assert device.units == [
+        {"model_number": None, "model": "MSZ", "serial_number": None}
+    ]
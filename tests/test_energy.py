@@ -0,0 +1,164 @@
+"""Energy accounting tests."""
+import json
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.pymelcloud.client import DeviceLocation
+from src.pymelcloud.clock import VirtualClock
+from src.pymelcloud.energy import EnergyAggregator, EnergyMeter, EnergyStore, EnergyTotals
+from src.pymelcloud.erv_device import ErvDevice
+from .util import build_device
+
+_T0 = datetime(2020, 1, 31, 23, 0)
+
+
+def test_meter_integrates_deltas():
+    meter = EnergyMeter()
+    assert meter.total is None
+
+    meter.add_reading(100.0, _T0)
+    meter.add_reading(0.0, _T0 + timedelta(minutes=30))
+    meter.add_reading(101.5, _T0 + timedelta(hours=1))
+    meter.add_reading(102.0, _T0 + timedelta(hours=2))
+
+    assert meter.total == 102.0
+    assert meter.resets == 0
+    assert meter.daily(date(2020, 1, 31)) == 0.0
+    assert meter.daily(date(2020, 2, 1)) == 2.0
+    assert meter.weekly(date(2020, 2, 1)) == 2.0
+    assert meter.monthly(date(2020, 1, 1)) == 0.0
+    assert meter.monthly(date(2020, 2, 1)) == 2.0
+
+
+def test_meter_reset_and_gap():
+    meter = EnergyMeter(gap_threshold=timedelta(hours=3))
+    meter.add_reading(100.0, _T0)
+    meter.add_reading(1.0, _T0 + timedelta(hours=1))
+    meter.add_reading(2.0, _T0 + timedelta(hours=5))
+
+    assert meter.total == 102.0
+    assert meter.resets == 1
+    assert meter.gaps == 1
+
+    restored = EnergyMeter()
+    restored.restore(meter.to_dict())
+    restored.add_reading(3.0, _T0 + timedelta(hours=6))
+
+    assert restored.total == 103.0
+    assert restored.monthly(date(2020, 2, 1)) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_store_survives_restart(tmp_path):
+    path = str(tmp_path / "energy.json")
+
+    device_conf, client = build_device("erv_listdevice.json", "erv_get.json")
+    device = ErvDevice(device_conf, client)
+    store = EnergyStore(path)
+    store.attach(device)
+    device_conf["Device"]["CurrentEnergyConsumed"] = 50
+    await device.update()
+    await store.flush()
+
+    assert device.total_energy_consumed == pytest.approx(0.15)
+    assert device.energy_meter.resets == 1
+
+    device_conf, client = build_device("erv_listdevice.json", "erv_get.json")
+    restarted = ErvDevice(device_conf, client)
+    EnergyStore(path).attach(restarted)
+
+    assert restarted.total_energy_consumed == pytest.approx(0.15)
+
+
+@pytest.mark.asyncio
+async def test_store_flushes_in_batches(tmp_path):
+    path = tmp_path / "energy.json"
+    clock = VirtualClock()
+    store = EnergyStore(str(path), flush_interval=timedelta(minutes=5), clock=clock)
+    devices = []
+    for device_id in [1, 2]:
+        device_conf, client = build_device("erv_listdevice.json", "erv_get.json")
+        device_conf["DeviceID"] = device_id
+        client.device_confs = [device_conf]
+        device = ErvDevice(device_conf, client)
+        store.attach(device)
+        devices.append(device)
+
+    for device in devices * 3:
+        await device.update()
+    await clock.advance(299)
+    assert not path.exists()
+
+    await clock.advance(1)
+    # Waits for the write started by the timer, which runs in an executor.
+    await store.flush()
+    assert set(json.loads(path.read_text())) == {"1", "2"}
+
+
+def test_meter_prunes_old_buckets():
+    meter = EnergyMeter(daily_buckets=2, weekly_buckets=1, monthly_buckets=1)
+    for days in range(40):
+        meter.add_reading(float(days + 1), _T0 + timedelta(days=days))
+
+    data = meter.to_dict()
+    assert list(data["daily"]) == ["2020-03-09", "2020-03-10"]
+    assert list(data["weekly"]) == ["2020-W11"]
+    assert list(data["monthly"]) == ["2020-03"]
+    assert meter.total == 40.0
+
+
+@pytest.mark.asyncio
+async def test_aggregator_rolls_up_incrementally():
+    devices = []
+    for device_id in [1, 2]:
+        device_conf, client = build_device(
+            "erv_listdevice.json", "erv_get.json", {"Fan": [0.5]}
+        )
+        device_conf["DeviceID"] = device_id
+        device = ErvDevice(device_conf, client)
+        devices.append(device)
+    locations = {1: DeviceLocation(1, 20, 21), 2: DeviceLocation(1, 20, None)}
+    client = MagicMock(device_locations=locations)
+
+    aggregator = EnergyAggregator(client)
+    detach = [aggregator.attach(device) for device in devices]
+
+    assert aggregator.building(1) == EnergyTotals(0.0, pytest.approx(0.2))
+    assert aggregator.floor(20) == EnergyTotals(0.0, pytest.approx(0.2))
+    assert aggregator.area(21) == EnergyTotals(0.0, pytest.approx(0.1))
+
+    await devices[0].update()
+
+    assert aggregator.area(21) == EnergyTotals(0.5, pytest.approx(0.1))
+    assert aggregator.building(1) == EnergyTotals(0.5, pytest.approx(0.2))
+
+    detach[0]()
+
+    assert aggregator.area(21) == EnergyTotals(0.0, 0.0)
+    assert aggregator.building(1) == EnergyTotals(0.0, pytest.approx(0.1))
+
+
+def test_aggregator_totals_do_not_drift():
+    client = MagicMock(device_locations={})
+    aggregator = EnergyAggregator(client)
+    devices = [
+        MagicMock(
+            device_id=device_id,
+            building_id=1,
+            daily_energy_consumed=0.1 * device_id,
+            energy_meter=MagicMock(total=1234.567 + 0.3 * device_id),
+        )
+        for device_id in range(1, 11)
+    ]
+    for device in devices:
+        aggregator.update(device)
+    for device in devices[1:]:
+        device.energy_meter.total += 0.7
+        aggregator.update(device)
+        aggregator.remove(device.device_id)
+
+    assert aggregator.building(1) == EnergyTotals(0.1, 1234.867)
+    aggregator.remove(1)
+    assert aggregator.building(1) == EnergyTotals(0.0, 0.0)
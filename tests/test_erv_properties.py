@@ -47,11 +47,11 @@ async def test_erv():
     assert device.room_co2_level is None
 
     assert device.ventilation_mode is None
-    assert device.ventilation_modes == [
+    assert device.ventilation_modes == (
         VENTILATION_MODE_RECOVERY,
         VENTILATION_MODE_BYPASS,
         VENTILATION_MODE_AUTO,
-    ]
+    )
     assert device.actual_ventilation_mode is None
     assert device.fan_speed is None
     assert device.fan_speeds is None
@@ -70,7 +70,7 @@ async def test_erv():
     assert device.ventilation_mode == VENTILATION_MODE_RECOVERY
     assert device.actual_ventilation_mode == VENTILATION_MODE_RECOVERY
     assert device.fan_speed == "3"
-    assert device.fan_speeds == ["1", "2", "3", "4"]
+    assert device.fan_speeds == ("1", "2", "3", "4")
     assert device.actual_supply_fan_speed == "3"
     assert device.actual_exhaust_fan_speed == "3"
     assert device.core_maintenance_required is False
@@ -0,0 +1,48 @@
+"""Device health tests."""
+from datetime import datetime, timedelta, timezone
+import pytest
+
+from src.pymelcloud.clock import VirtualClock
+from src.pymelcloud.health import CircuitBreaker, is_stale
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_backs_off():
+    clock = VirtualClock(100.0)
+    breaker = CircuitBreaker(2, probe_interval=timedelta(seconds=10), clock=clock)
+
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow_request()
+
+    await clock.advance(10)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    await clock.advance(19)
+    assert not breaker.allow_request()
+    await clock.advance(1)
+    assert breaker.allow_request()
+
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.consecutive_failures == 0
+
+
+def test_circuit_breaker_disabled():
+    breaker = CircuitBreaker(0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow_request()
+    assert breaker.consecutive_failures == 10
+
+    with pytest.raises(ValueError):
+        CircuitBreaker(-1)
+
+
+def test_is_stale():
+    now = datetime.now(timezone.utc)
+    assert not is_stale(None, timedelta(hours=1))
+    assert not is_stale(now, timedelta(hours=1))
+    assert is_stale(now - timedelta(hours=2), timedelta(hours=1))
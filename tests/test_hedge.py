@@ -0,0 +1,87 @@
+"""Hedged request tests."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.pymelcloud.client import Client
+from src.pymelcloud.hedge import HedgePolicy
+
+
+def _policy(**kwargs) -> HedgePolicy:
+    policy = HedgePolicy(
+        min_samples=2, min_delay=timedelta(milliseconds=10), **kwargs
+    )
+    policy.record(0.001)
+    policy.record(0.001)
+    return policy
+
+
+def _slow_then_fast_session(*delays: float) -> MagicMock:
+    delays_iter = iter(delays)
+
+    def request(method, url, **kwargs):
+        delay = next(delays_iter)
+
+        async def read():
+            await asyncio.sleep(delay)
+            return f'{{"delay": {delay}}}'.encode()
+
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=MagicMock(read=read))
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+    session = MagicMock()
+    session.request = MagicMock(side_effect=request)
+    return session
+
+
+def test_delay():
+    policy = HedgePolicy(percentile=0.5, min_samples=3, min_delay=timedelta(0))
+    assert policy.delay() is None
+    for latency in (0.3, 0.1, 0.2):
+        policy.record(latency)
+    assert policy.delay() == 0.2
+
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=1.5)
+
+
+@pytest.mark.asyncio
+async def test_slow_get_is_hedged():
+    policy = _policy(budget=1.0)
+    session = _slow_then_fast_session(1.0, 0.0)
+    client = Client("token", session, hedge_policy=policy)
+
+    state = await client.fetch_device_state(MagicMock(device_id=1, building_id=1))
+
+    assert state == {"delay": 0.0}
+    assert session.request.call_count == 2
+    assert policy.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_budget():
+    policy = _policy(budget=0.5)
+    session = _slow_then_fast_session(0.05, 0.05, 0.0)
+    client = Client("token", session, hedge_policy=policy)
+    device = MagicMock(device_id=1, building_id=1)
+
+    await client.fetch_device_state(device)
+    assert policy.hedges == 0
+    await client.fetch_device_state(device)
+    assert policy.hedges == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_are_not_hedged():
+    policy = _policy(budget=1.0)
+    session = _slow_then_fast_session(0.05, 0.0)
+    client = Client("token", session, hedge_policy=policy)
+
+    await client.set_device_state({"DeviceType": 0})
+
+    assert session.request.call_count == 1
+    assert policy.hedges == 0
@@ -0,0 +1,82 @@
+"""Telemetry recorder tests."""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.pymelcloud.atw_device import AtwDevice
+from src.pymelcloud.recorder import RingBuffer, TelemetryRecorder
+from .util import build_device
+
+_T0 = datetime(2100, 1, 1, tzinfo=timezone.utc)
+
+
+def test_ring_buffer_wraps(tmp_path):
+    path = str(tmp_path / "buffer.ring")
+    buffer = RingBuffer(path, capacity=3)
+    for i in range(5):
+        buffer.append(float(i), i * 10.0)
+
+    assert len(buffer) == 3
+    assert buffer.samples() == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert buffer.samples(start=2.5, end=3.5) == [(3.0, 30.0)]
+    buffer.close()
+
+    reopened = RingBuffer(path, capacity=100)
+    assert reopened.capacity == 3
+    assert reopened.last() == (4.0, 40.0)
+    reopened.close()
+
+
+def test_ring_buffer_invalid_file(tmp_path):
+    path = tmp_path / "buffer.ring"
+    path.write_bytes(b"garbage" * 10)
+
+    with pytest.raises(ValueError):
+        RingBuffer(str(path))
+
+
+@pytest.mark.asyncio
+async def test_recorder(tmp_path):
+    device_conf, client = build_device("atw_2zone_listdevice.json", "atw_2zone_get.json")
+    device = AtwDevice(device_conf, client)
+    recorder = TelemetryRecorder(str(tmp_path), capacity=10)
+    recorder.attach(device)
+
+    await device.update()
+
+    assert [value for _, value in recorder.query(device.device_id, "tank_temperature")] == [49.5]
+
+    recorder.record(device, _T0)
+    device._state = {**device._state, "TankWaterTemperature": 60.0}
+    recorder.record(device, _T0 + timedelta(minutes=1))
+    recorder.record(device, _T0 + timedelta(minutes=2))
+    device._state = {**device._state, "TankWaterTemperature": 50.0}
+    recorder.record(device, _T0 + timedelta(minutes=3))
+
+    assert recorder.query(device.device_id, "tank_temperature", start=_T0) == [
+        (_T0 + timedelta(minutes=1), 60.0),
+        (_T0 + timedelta(minutes=3), 50.0),
+    ]
+    assert recorder.query(device.device_id, "flow_temperature", start=_T0) == []
+    assert recorder.downsample(
+        device.device_id, "tank_temperature", timedelta(days=1), start=_T0
+    ) == [(_T0, 55.0)]
+    recorder.close()
+
+
+
+def test_recorder_queries_do_not_create_buffers(tmp_path):
+    fields = {"tank_temperature": lambda device: device.tank_temperature}
+    recorder = TelemetryRecorder(str(tmp_path), capacity=10, fields=fields)
+
+    assert recorder.query(1, "tank_temperature") == []
+    assert recorder.downsample(1, "tank_temperature", timedelta(hours=1)) == []
+    assert list(tmp_path.iterdir()) == []
+
+    recorder.record(MagicMock(device_id=1, tank_temperature=50.0), _T0)
+    recorder.close()
+
+    reopened = TelemetryRecorder(str(tmp_path), capacity=10, fields=fields)
+    assert reopened.query(1, "tank_temperature") == [(_T0, 50.0)]
+    reopened.close()
@@ -0,0 +1,110 @@
+"""Device registry tests."""
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.pymelcloud.const import (
+    DEVICE_TYPE_ATA,
+    DEVICE_TYPE_ATW,
+    DEVICE_TYPE_ERV,
+    DEVICE_TYPE_UNKNOWN,
+)
+from src.pymelcloud.registry import (
+    EVENT_DEVICE_ADDED,
+    EVENT_DEVICE_CHANGED,
+    EVENT_DEVICE_REMOVED,
+    DeviceRegistry,
+    classify_confs,
+)
+
+
+def _load_conf(name: str, device_id: int):
+    with open(os.path.join(os.path.dirname(__file__), "samples", name)) as file:
+        conf = json.load(file)
+    conf["DeviceID"] = device_id
+    return conf
+
+
+def _unknown_conf(device_id: int):
+    return {"DeviceID": device_id, "Device": {"DeviceType": 99}}
+
+
+def test_classify_confs():
+    ata = _load_conf("ata_listdevice.json", 1)
+    erv = _load_conf("erv_listdevice.json", 2)
+    unknown = _unknown_conf(3)
+
+    groups = classify_confs([ata, erv, unknown])
+
+    assert groups == {
+        "ata": [ata],
+        "atw": [],
+        "erv": [erv],
+        DEVICE_TYPE_UNKNOWN: [unknown],
+    }
+
+
+@pytest.mark.asyncio
+async def test_registry_sync():
+    client = MagicMock()
+    client.update_confs = AsyncMock()
+    client.device_confs = [
+        _load_conf("ata_listdevice.json", 1),
+        _load_conf("atw_1zone_listdevice.json", 2),
+        _unknown_conf(3),
+    ]
+    registry = DeviceRegistry(client)
+    events = []
+    registry.add_listener(lambda event, device: events.append((event, device)))
+
+    added, removed, changed = await registry.update()
+
+    assert [device.device_type for device in added] == [
+        DEVICE_TYPE_ATA,
+        DEVICE_TYPE_ATW,
+    ]
+    assert removed == [] and changed == []
+    assert events == [(EVENT_DEVICE_ADDED, device) for device in added]
+    assert registry.unknown_devices == {3: 99}
+    ata = registry.get(1)
+    atw = registry.get(2)
+    events.clear()
+
+    client.device_confs = [
+        _load_conf("ata_listdevice.json", 1),
+        _load_conf("erv_listdevice.json", 4),
+    ]
+    client.device_confs[0]["DeviceName"] = "Bedroom"
+    added, removed, changed = await registry.update()
+
+    assert [device.device_type for device in added] == [DEVICE_TYPE_ERV]
+    assert removed == [atw]
+    assert changed == [ata]
+    assert events == [
+        (EVENT_DEVICE_REMOVED, atw),
+        (EVENT_DEVICE_ADDED, added[0]),
+        (EVENT_DEVICE_CHANGED, ata),
+    ]
+    assert registry.unknown_devices == {}
+    assert registry.get(1) is ata
+    assert {key: len(devices) for key, devices in registry.devices.items()} == {
+        "ata": 1,
+        "atw": 0,
+        "erv": 1,
+    }
+    with pytest.raises(KeyError):
+        registry.get(2)
+    with pytest.raises(ValueError, match="removed"):
+        await atw.update()
+
+    events.clear()
+    client.device_confs = [dict(conf) for conf in client.device_confs]
+    client.device_confs[0]["Device"] = {
+        **client.device_confs[0]["Device"],
+        "RoomTemperature": 30.0,
+        "WifiSignalStrength": -70,
+    }
+    assert await registry.update() == ([], [], [])
+    assert events == []
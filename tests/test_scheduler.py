@@ -0,0 +1,89 @@
+"""Request scheduler tests."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from src.pymelcloud.clock import VirtualClock
+from src.pymelcloud.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE_WRITE,
+    RequestScheduler,
+)
+
+
+async def _run(scheduler: RequestScheduler, priority: int, order: list, name: str):
+    async with scheduler.slot(priority):
+        order.append(name)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_writes_preempt_background():
+    scheduler = RequestScheduler(1)
+    order: list = []
+
+    await scheduler.acquire()
+    tasks = [
+        asyncio.ensure_future(_run(scheduler, PRIORITY_BACKGROUND, order, "poll1")),
+        asyncio.ensure_future(_run(scheduler, PRIORITY_BULK, order, "bulk")),
+        asyncio.ensure_future(_run(scheduler, PRIORITY_BACKGROUND, order, "poll2")),
+        asyncio.ensure_future(
+            _run(scheduler, PRIORITY_INTERACTIVE_WRITE, order, "write")
+        ),
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 4
+    scheduler.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["write", "poll1", "poll2", "bulk"]
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_aging():
+    clock = VirtualClock()
+    scheduler = RequestScheduler(1, aging=timedelta(seconds=1), clock=clock)
+    order: list = []
+
+    await scheduler.acquire()
+    bulk = asyncio.ensure_future(_run(scheduler, PRIORITY_BULK, order, "bulk"))
+    await asyncio.sleep(0)
+    await clock.advance(5)
+    write = asyncio.ensure_future(
+        _run(scheduler, PRIORITY_INTERACTIVE_WRITE, order, "write")
+    )
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(bulk, write)
+
+    assert order == ["bulk", "write"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter():
+    scheduler = RequestScheduler(1)
+
+    await scheduler.acquire()
+    waiter = asyncio.ensure_future(scheduler.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.release()
+
+    assert scheduler.active == 0
+    assert scheduler.waiting == 0
+
+    with pytest.raises(ValueError):
+        RequestScheduler(0)
+
+
+@pytest.mark.asyncio
+async def test_unlimited():
+    scheduler = RequestScheduler()
+    for _ in range(100):
+        await scheduler.acquire()
+    assert scheduler.active == 100
@@ -0,0 +1,71 @@
+"""Fleet snapshot tests."""
+import pytest
+
+from src.pymelcloud.ata_device import AtaDevice
+from src.pymelcloud.atw_device import AtwDevice
+from src.pymelcloud.erv_device import ErvDevice
+from src.pymelcloud.snapshot import BACKEND_NUMPY, fleet_snapshot
+from .util import build_device
+
+
+async def _build_fleet():
+    devices = []
+    for device_class, conf_name, state_name, report in [
+        (AtaDevice, "ata_listdevice.json", "ata_get.json", {"Heating": [0.0, 1.5]}),
+        (AtwDevice, "atw_2zone_listdevice.json", "atw_2zone_get.json", None),
+        (ErvDevice, "erv_listdevice.json", "erv_get.json", None),
+    ]:
+        device_conf, client = build_device(conf_name, state_name, report)
+        device = device_class(device_conf, client)
+        await device.update()
+        devices.append(device)
+    return devices
+
+
+@pytest.mark.asyncio
+async def test_fleet_snapshot():
+    devices = await _build_fleet()
+
+    snapshot = fleet_snapshot(devices)
+
+    assert snapshot["device_type"] == ["ata", "atw", "erv"]
+    assert snapshot["device_id"] == [device.device_id for device in devices]
+    assert snapshot["room_temperature"] == [
+        devices[0].room_temperature,
+        devices[1].zones[0].room_temperature,
+        devices[2].room_temperature,
+    ]
+    assert snapshot["target_temperature"] == [
+        devices[0].target_temperature,
+        devices[1].zones[0].target_temperature,
+        None,
+    ]
+    assert snapshot["power"] == [device.power for device in devices]
+    assert snapshot["wifi_signal"] == [device.wifi_signal for device in devices]
+    assert snapshot["total_energy_consumed"][2] == devices[2].total_energy_consumed
+    assert snapshot["daily_energy_consumed"] == [1.5, None, None]
+    assert snapshot["daily_energy_consumed"] == [
+        device.daily_energy_consumed for device in devices
+    ]
+
+
+def test_fleet_snapshot_empty():
+    snapshot = fleet_snapshot([])
+
+    assert all(column == [] for column in snapshot.values())
+
+
+def test_fleet_snapshot_invalid_backend():
+    with pytest.raises(ValueError):
+        fleet_snapshot([], backend="arrow")
+
+
+@pytest.mark.asyncio
+async def test_fleet_snapshot_numpy():
+    np = pytest.importorskip("numpy")
+    devices = await _build_fleet()
+
+    snapshot = fleet_snapshot(devices, backend=BACKEND_NUMPY)
+
+    assert snapshot["device_id"].dtype == np.int64
+    assert np.isnan(snapshot["target_temperature"][2])
@@ -0,0 +1,56 @@
+"""Warm-up tests."""
+import asyncio
+from typing import Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.pymelcloud import warm_up_devices
+from src.pymelcloud.registry import DeviceRegistry
+
+
+class _FakeDevice:
+    running = 0
+    max_running = 0
+
+    def __init__(self, device_id: int, error: Optional[Exception] = None):
+        self.device_id = device_id
+        self._error = error
+        self.updated = False
+        self.units_loaded = False
+
+    async def update(self):
+        _FakeDevice.running += 1
+        _FakeDevice.max_running = max(_FakeDevice.max_running, _FakeDevice.running)
+        await asyncio.sleep(0.01)
+        _FakeDevice.running -= 1
+        if self._error is not None:
+            raise self._error
+        self.updated = True
+
+    async def load_units(self):
+        self.units_loaded = True
+
+
+@pytest.mark.asyncio
+async def test_warm_up_devices():
+    error = ValueError("offline")
+    devices = [_FakeDevice(1), _FakeDevice(2, error), _FakeDevice(3), _FakeDevice(4)]
+
+    failures = await warm_up_devices(devices, limit=2)
+
+    assert failures == {2: error}
+    assert [device.updated for device in devices] == [True, False, True, True]
+    assert all(device.units_loaded for device in devices)
+    assert _FakeDevice.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_registry_keeps_warm_up_failures():
+    error = ValueError("offline")
+    devices = [_FakeDevice(1), _FakeDevice(2, error)]
+    registry = DeviceRegistry(MagicMock())
+    registry._devices["ata"] = {device.device_id: device for device in devices}
+
+    assert await registry.warm_up() == {2: error}
+    assert registry.warm_up_failures == {2: error}
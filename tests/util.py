@@ -16,8 +16,10 @@ def build_device(device_conf_name: str, device_state_name: str, energy_report: O
 
     with patch("src.pymelcloud.client.Client") as _client:  # Ensure the patch path reflects the new location
         _client.update_confs = AsyncMock()
+        _client.conf_generation = 1
         _client.device_confs.__iter__ = Mock(return_value=[device_conf].__iter__())
         _client.fetch_device_units = AsyncMock(return_value=[])
+        _client.cached_device_units = Mock(return_value=None)
         _client.fetch_device_state = AsyncMock(return_value=device_state)
         _client.fetch_energy_report = AsyncMock(return_value=energy_report)
         client = _client